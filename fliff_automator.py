@@ -2,52 +2,131 @@ import os
 import logging
 import time
 import re
+import random
 from datetime import datetime
-from typing import Optional, List, Dict, Tuple
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, ElementHandle
+from functools import lru_cache
+from typing import Optional, Dict, Final
+from playwright.sync_api import sync_playwright, Playwright, Page, Browser, BrowserContext, Locator
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError, expect
 
 logger = logging.getLogger(__name__)
 
+# Verified UI selectors, shared by every automator instance
+_SELECTORS: Final[Dict[str, str]] = {
+    'login_button': ".ticket-submit-button__label:has-text('LOGIN')",
+    'location_continue': ".button__label:has-text('Continue')",
+    'nav_account': "div.nav-account",
+    'balance_container': "div.balances__item img[alt*='cash icon'] + span.balances__balance",
+    'bet_slip_container': ".mobile-ticket-container",
+    'open_bet_slips': ".bet-slip",
+    'bet_slip_payout': "[class*='payout']",
+    'game_cards': "div.card-shared-container",
+    'proposal': "div.card-home-proposal:not(:has(img[alt=\"lock\"]))",
+    'odds_label': ".card-cell-label",
+    'shop_claim_button': ".free-coins-plaque__claim-button",
+    'rewards_claim_buttons': ".claim-button",
+    'wager_input': ".risk-amount-input__amount",
+    'submit_bet_button': ".ticket-submit-button__label:has-text('SUBMIT')",
+    'bet_success_confirmation': ".ticket-submit-button__bonus-text:has-text('Claim')"
+}
+
+# Translation tables for stripping currency formatting
+_STRIP_MONEY = str.maketrans('', '', ',$')
+_STRIP_COMMA = str.maketrans('', '', ',')
+
+# Precompiled patterns for parsing payout text and detecting a populated bet slip
+_PAYOUT_DEC_RE = re.compile(r'[\d,]+\.?\d*')
+_DIGIT_RE = re.compile(r'\d')
+
+# Budget (ms) for probing elements that are often absent on purpose (no open slips, nothing to
+# claim). A route change does not mean the list has rendered, and a miss is acted on (open
+# wagers treated as none, rewards left unclaimed), so allow a slow render while still keeping
+# the common empty case well short of the 30s default
+_OPTIONAL_PROBE_TIMEOUT = 3000
+
+# Resource types the bot never reads; aborting them cuts page-load bandwidth
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media'})
+
+# Third-party trackers the page loads alongside the app, aborted whatever their resource type
+_BLOCKED_URL_RE = re.compile(r'google-analytics|googletagmanager|doubleclick|segment\.(?:io|com)|hotjar')
+
+# Collects the odds label of every unlocked proposal in a single round-trip
+_EXTRACT_ODDS_JS = """
+([gameSel, proposalSel, labelSel]) =>
+    Array.from(document.querySelectorAll(gameSel)).flatMap((game, gi) =>
+        Array.from(game.querySelectorAll(proposalSel)).map((proposal, pi) => {
+            const label = proposal.querySelector(labelSel);
+            return {gi, pi, odds: label ? label.textContent.trim() : null};
+        }))
+"""
+
+# Maps the matched open bet slips to their payout labels in one round-trip (null when a slip has none)
+_OPEN_PAYOUTS_JS = """
+(slips, payoutSel) => slips.map(slip => {
+    const payout = slip.querySelector(payoutSel);
+    return payout ? payout.textContent : null;
+})
+"""
+
+# Clicks every claimable reward button in one batch and reports how many were clicked
+_CLAIM_REWARDS_JS = """
+(sel) => {
+    const buttons = Array.from(document.querySelectorAll(sel)).filter(b => /claim/i.test(b.textContent));
+    buttons.forEach(b => b.click());
+    return buttons.length;
+}
+"""
+
 class FliffAutomator:
     """Core browser automation for Fliff interactions."""
     
-    def __init__(self):
+    def __init__(self, min_bet_threshold: float = 1.80):
+        self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._locators: Dict[str, Locator] = {}
         
         # Configuration
         self.base_url = "https://fliff.com"
         self.latitude = float(os.getenv('GEOLOCATION_LATITUDE', '40.7128'))
         self.longitude = float(os.getenv('GEOLOCATION_LONGITUDE', '-74.0060'))
+        self.min_bet_threshold = min_bet_threshold  # Open wagers paying more than this block collection
         
         # Verified UI selectors
-        self.selectors = {
-            'login_button': ".ticket-submit-button__label:has-text('LOGIN')",
-            'location_continue': ".button__label:has-text('Continue')",
-            'balance_container': "div.balances__item img[alt*='cash icon'] + span.balances__balance",
-            'bet_slip_container': ".mobile-ticket-container",
-            'shop_claim_button': ".free-coins-plaque__claim-button",
-            'rewards_claim_buttons': ".claim-button",
-            'submit_bet_button': ".ticket-submit-button__label:has-text('SUBMIT')",
-            'bet_success_confirmation': ".ticket-submit-button__bonus-text:has-text('Claim')"
-        }
+        self.selectors = _SELECTORS
         
         logger.info("FliffAutomator initialized")
     
     def _setup_browser(self):
         """Initialize browser with mobile emulation."""
         try:
-            self.browser = sync_playwright().start().chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-extensions',
-                    '--disable-notifications'
-                ]
-            )
+            # Start the driver and browser once; later setups only need a fresh context
+            if self.playwright is None:
+                self.playwright = sync_playwright().start()
+            if self.browser is None:
+                self.browser = self.playwright.chromium.launch(
+                    headless=True,
+                    args=[
+                        '--no-sandbox',
+                        '--disable-dev-shm-usage',
+                        '--disable-gpu',
+                        '--disable-extensions',
+                        '--disable-notifications',
+                        # Headless pages count as backgrounded; keep timers and rendering at full speed
+                        '--disable-background-timer-throttling',
+                        '--disable-backgrounding-occluded-windows',
+                        '--disable-renderer-backgrounding',
+                        '--disable-ipc-flooding-protection',
+                        '--disable-features=TranslateUI',
+                        # Images are never read (and already aborted by the resource route)
+                        '--blink-settings=imagesEnabled=false'
+                    ]
+                )
+            
+            # Only the context is per-session; close a previous one instead of leaking it
+            if self.context is not None:
+                self.context.close()
             
             # Mobile emulation context
             self.context = self.browser.new_context(
@@ -56,9 +135,13 @@ class FliffAutomator:
                 geolocation={'latitude': self.latitude, 'longitude': self.longitude},
                 permissions=['geolocation']
             )
+            # FLIFF_LOAD_STATIC=1 loads every resource, which helps when debugging page rendering
+            if os.getenv('FLIFF_LOAD_STATIC') != '1':
+                self.context.route("**/*", self._route_resource)
             
             self.page = self.context.new_page()
             self.page.set_default_timeout(30000)  # 30 second timeout
+            self._locators.clear()  # Cached locators are bound to the previous page
             
             logger.info("Browser setup completed successfully")
             
@@ -66,16 +149,73 @@ class FliffAutomator:
             logger.error(f"Failed to setup browser: {e}")
             raise
     
-    def _retry_operation(self, operation, max_retries=3, delay=2, operation_name="operation"):
-        """Retry an operation with exponential backoff."""
+    @staticmethod
+    def _route_resource(route):
+        """Abort requests for non-essential resource types and trackers, let everything else through."""
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_URL_RE.search(request.url):
+            route.abort()
+        else:
+            route.continue_()
+    
+    def _loc(self, name: str) -> Locator:
+        """Return a cached locator for a named selector on the current page."""
+        locator = self._locators.get(name)
+        if locator is None:
+            locator = self.page.locator(self.selectors[name])
+            self._locators[name] = locator
+        return locator
+    
+    def _wait_for_optional(self, name: str, timeout: int = _OPTIONAL_PROBE_TIMEOUT) -> bool:
+        """Wait briefly for an element that may legitimately be absent."""
+        try:
+            self._loc(name).first.wait_for(state='attached', timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
+    def _navigate(self, path: str):
+        """Follow an in-app link and wait for the client-side router to land on its route.
+        
+        The app is a single-page app, so these clicks never fire a new DOMContentLoaded;
+        the URL change is the signal that the target page has started rendering.
+        """
+        self.page.click(f'a[href="{path}"]')
+        self.page.wait_for_url(f"**{path}*")
+    
+    @staticmethod
+    def _expect_settled(assertion, description: str) -> bool:
+        """Run a Playwright ``expect`` assertion, tolerating a timeout.
+        
+        Args:
+            assertion: Callable performing the ``expect`` check
+            description: What is being waited for, used in the log message
+            
+        Returns:
+            True if the condition was met, False if it timed out
+        """
+        try:
+            assertion()
+            return True
+        except AssertionError:
+            logger.debug(f"Timed out waiting for {description}, continuing")
+            return False
+    
+    def _retry_operation(self, operation, max_retries=3, delay=1.0, max_delay=30.0,
+                         retry_on=(PlaywrightTimeoutError, PlaywrightError, ConnectionError), operation_name="operation"):
+        """Retry transient failures with jittered exponential backoff; re-raise anything else immediately.
+        
+        Playwright reports network failures (net::ERR_*), interrupted navigations and closed
+        targets as its generic Error, so that is retried alongside its timeouts.
+        """
         for attempt in range(max_retries):
             try:
                 return operation()
             except Exception as e:
-                if attempt == max_retries - 1:
+                if not isinstance(e, retry_on) or attempt == max_retries - 1:
                     raise
-                wait_time = delay * (2 ** attempt)
-                logger.warning(f"{operation_name} failed (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait_time}s...")
+                wait_time = min(max_delay, delay * (2 ** attempt)) * (1 + random.random() * 0.5)
+                logger.warning(f"{operation_name} failed (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait_time:.1f}s...")
                 time.sleep(wait_time)
     
     def login(self):
@@ -108,8 +248,8 @@ class FliffAutomator:
             except:
                 logger.info("No location prompt found")
             
-            # Wait for navigation to complete
-            self.page.wait_for_load_state('networkidle')
+            # Wait for the logged-in navigation bar instead of network quiescence
+            self._loc('nav_account').wait_for(state='visible')
             logger.info("Login completed successfully")
         
         self._retry_operation(_login, operation_name="login")
@@ -120,88 +260,115 @@ class FliffAutomator:
             logger.info("Fetching current balance")
             
             # Navigate to account page
-            self.page.click('div.nav-account')
-            self.page.wait_for_load_state('networkidle')
+            self.page.click(self.selectors['nav_account'])
             
             # Parse balance using verified selector
-            balance_element = self.page.wait_for_selector(self.selectors['balance_container'])
-            if not balance_element:
-                raise Exception("Balance element not found")
+            balance_element = self._loc('balance_container')
+            balance_element.wait_for()
             
-            balance_text = balance_element.text_content().strip()
-            # Remove commas and convert to float
-            balance_clean = re.sub(r'[,$]', '', balance_text)
-            balance = float(balance_clean)
+            # Strip currency formatting in one pass; float() already ignores surrounding whitespace
+            balance = float(balance_element.text_content().translate(_STRIP_MONEY))
             
             logger.info(f"Current balance: ${balance:,.2f}")
             return balance
         
         return self._retry_operation(_get_balance, operation_name="get_balance")
     
+    def get_balance_no_nav(self, previous_balance: Optional[float] = None) -> float:
+        """Read the balance widget on the current page, navigating to the account page only if it is absent.
+        
+        Args:
+            previous_balance: Balance before an action expected to change it; while the widget
+                still shows this amount, wait for it to update and fall back to get_balance()
+                if it never does
+        """
+        balance_element = self.page.query_selector(self.selectors['balance_container'])
+        if not balance_element:
+            return self.get_balance()
+        
+        balance_text = balance_element.text_content()
+        balance = float(balance_text.translate(_STRIP_MONEY))
+        if previous_balance is not None and balance == previous_balance:
+            # The claim clicks return before the widget re-renders, so the first read can be stale
+            widget = self._loc('balance_container').first
+            if not self._expect_settled(
+                lambda: expect(widget).not_to_have_text(balance_text, timeout=5000),
+                "balance widget to update"
+            ):
+                return self.get_balance()
+            balance = float(widget.text_content().translate(_STRIP_MONEY))
+        
+        logger.info(f"Current balance (in place): ${balance:,.2f}")
+        return balance
+    
     def check_open_wagers(self) -> bool:
         """Check if there are open wagers that might block collection."""
         def _check_wagers():
             logger.info("Checking for open wagers")
             
             # Navigate to activity page
-            self.page.click('a[href="/activity"]')
-            self.page.wait_for_load_state('networkidle')
-            
-            # Look for bet slips
-            bet_slips = self.page.query_selector_all('.bet-slip')
-            if not bet_slips:
+            self._navigate('/activity')
+            self._wait_for_optional('open_bet_slips')
+            
+            # Read every slip's payout label in a single call instead of one call per slip
+            payout_texts = self.page.eval_on_selector_all(
+                self.selectors['open_bet_slips'],
+                _OPEN_PAYOUTS_JS,
+                self.selectors['bet_slip_payout']
+            )
+            if not payout_texts:
                 logger.info("No open wagers found")
                 return False
             
-            # Check if any bet has payout > $1.80
-            for slip in bet_slips:
-                payout_text = slip.text_content()
-                if 'payout' in payout_text.lower():
-                    # Extract numeric value
-                    payout_match = re.search(r'[\d,]+', payout_text)
-                    if payout_match:
-                        payout = float(payout_match.group().replace(',', ''))
-                        if payout > 1.80:
-                            logger.info(f"Found blocking wager with payout: ${payout:,.2f}")
-                            return True
+            # Stop at the first bet whose labelled payout exceeds the threshold
+            for payout_text in payout_texts:
+                if payout_text is None:
+                    continue
+                
+                payout = self._parse_payout(payout_text)
+                if payout > self.min_bet_threshold:
+                    logger.info(f"Found blocking wager with payout: ${payout:,.2f}")
+                    return True
             
             logger.info("No blocking wagers found")
             return False
         
         return self._retry_operation(_check_wagers, operation_name="check_open_wagers")
     
-    def check_and_claim_rewards(self):
-        """Claim available daily and bi-hourly rewards."""
+    def check_and_claim_rewards(self) -> bool:
+        """Claim available daily and bi-hourly rewards.
+        
+        Returns:
+            True if the shop reward or any other reward was claimed, False if nothing was claimable
+        """
         def _claim_rewards():
             logger.info("Checking and claiming rewards")
             
             # Navigate to shop
-            self.page.click('a[href="/shop"]')
-            self.page.wait_for_load_state('networkidle')
+            self._navigate('/shop')
             
             # Claim shop rewards
-            shop_claim = self.page.query_selector(self.selectors['shop_claim_button'])
-            if shop_claim:
-                shop_claim.click()
+            shop_claimed = self._wait_for_optional('shop_claim_button')
+            if shop_claimed:
+                self._loc('shop_claim_button').first.click()
                 logger.info("Shop rewards claimed")
-                time.sleep(2)  # Wait for animation
+                # Wait for the claim animation to finish rather than sleeping a fixed time
+                self._expect_settled(
+                    lambda: expect(self._loc('shop_claim_button').first).to_be_hidden(timeout=5000),
+                    "shop claim button to disappear"
+                )
             
             # Navigate to rewards
-            self.page.click('a[href="/rewards"]')
-            self.page.wait_for_load_state('networkidle')
-            
-            # Claim other rewards
-            reward_buttons = self.page.query_selector_all(self.selectors['rewards_claim_buttons'])
-            claimed_count = 0
-            for button in reward_buttons:
-                if 'claim' in button.text_content().lower():
-                    button.click()
-                    claimed_count += 1
-                    time.sleep(1)  # Wait between claims
+            self._navigate('/rewards')
+            self._wait_for_optional('rewards_claim_buttons')
+            
+            # Claim other rewards in a single in-page batch
+            claimed_count = self.page.evaluate(_CLAIM_REWARDS_JS, self.selectors['rewards_claim_buttons'])
             
             logger.info(f"Claimed {claimed_count} additional rewards")
+            return shop_claimed or claimed_count > 0
         
-        self._retry_operation(_claim_rewards, operation_name="claim_rewards")
+        return self._retry_operation(_claim_rewards, operation_name="claim_rewards")
     
     def execute_betting_strategy(self, min_payout: float, max_payout: float) -> bool:
         """Execute parlay construction strategy."""
@@ -209,39 +376,43 @@ class FliffAutomator:
             logger.info(f"Executing betting strategy (target payout: ${min_payout:,.2f}-${max_payout:,.2f})")
             
             # Navigate to sports page
-            self.page.click('a[href="/sports"]')
-            self.page.wait_for_load_state('networkidle')
-            
-            # Get available games
-            games = self.page.query_selector_all('div.card-shared-container')
-            if not games:
+            self._navigate('/sports')
+            self._wait_for_optional('game_cards', timeout=10000)
+            
+            # Extract odds for every available proposal in one page round-trip
+            proposals = self.page.evaluate(_EXTRACT_ODDS_JS, [
+                self.selectors['game_cards'],
+                self.selectors['proposal'],
+                self.selectors['odds_label']
+            ])
+            if not proposals:
                 logger.warning("No games found")
                 return False
             
             # Filter for safe odds (-250 to +200)
             safe_games = []
-            for game in games:
+            for proposal in proposals:
                 try:
-                    proposals = game.query_selector_all('div.card-home-proposal:not(:has(img[alt="lock"]))')
-                    for proposal in proposals:
-                        odds_text = proposal.query_selector('.card-cell-label').text_content().strip()
-                        odds_decimal = self._convert_odds_to_decimal(odds_text)
-                        
-                        if -250 <= odds_decimal <= 200:
-                            safe_games.append({
-                                'element': proposal,
-                                'odds': odds_decimal,
-                                'game': game
-                            })
+                    odds_decimal = self._convert_odds_to_decimal(proposal['odds'])
                 except Exception as e:
-                    logger.warning(f"Error processing game: {e}")
+                    logger.warning(f"Error processing proposal odds {proposal['odds']!r}: {e}")
                     continue
+                
+                if -250 <= odds_decimal <= 200:
+                    safe_games.append({
+                        'game_index': proposal['gi'],
+                        'proposal_index': proposal['pi'],
+                        'odds': odds_decimal
+                    })
             
             if not safe_games:
                 logger.warning("No games with safe odds found")
                 return False
             
-            # Build parlay
+            # Build parlay, reading the payout from the cached bet slip locator; text_content
+            # already waits for the slip, so no extra wait is needed per selection
+            payout_loc = self._loc('bet_slip_container')
+            payout_text = None
             current_payout = 1.0
             parlay_selections = []
             
@@ -249,12 +420,25 @@ class FliffAutomator:
                 if current_payout >= max_payout:
                     break
                 
-                # Add selection to parlay
-                game_data['element'].click()
-                time.sleep(1)  # Wait for bet slip update
+                # Add selection to parlay, resolving only the chosen proposal
+                game_proposals = self._loc('game_cards').nth(game_data['game_index']).locator(self.selectors['proposal'])
+                game_proposals.nth(game_data['proposal_index']).click()
+                
+                # Wait until the bet slip reflects the new selection instead of sleeping
+                if payout_text is None:
+                    self._expect_settled(
+                        lambda: expect(payout_loc).to_contain_text(_DIGIT_RE, timeout=3000),
+                        "bet slip payout to appear"
+                    )
+                else:
+                    self._expect_settled(
+                        lambda: expect(payout_loc).not_to_have_text(payout_text, timeout=3000),
+                        "bet slip payout to update"
+                    )
                 
                 # Get updated payout
-                current_payout = self._get_current_payout()
+                payout_text = payout_loc.text_content()
+                current_payout = self._parse_payout(payout_text)
                 parlay_selections.append(game_data)
                 
                 logger.info(f"Added selection, current payout: ${current_payout:,.2f}")
@@ -268,31 +452,37 @@ class FliffAutomator:
         
         return self._retry_operation(_execute_strategy, operation_name="betting_strategy")
     
-    def _convert_odds_to_decimal(self, odds_text: str) -> float:
-        """Convert American odds to decimal multiplier."""
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _convert_odds_to_decimal(odds_text: str) -> float:
+        """Convert American odds to decimal multiplier (memoized; the set of odds strings is small)."""
         odds_text = odds_text.strip()
+        sign = odds_text[:1]
         
-        if odds_text.startswith('+'):
+        if sign == '+':
             return (float(odds_text[1:]) + 100) / 100
-        elif odds_text.startswith('-'):
-            return (100 + float(odds_text[1:])) / float(odds_text[1:])
+        elif sign == '-':
+            odds_value = float(odds_text[1:])  # Parse once, used twice
+            return (100 + odds_value) / odds_value
         else:
             return float(odds_text)
     
-    def _get_current_payout(self) -> float:
+    def get_current_payout(self) -> float:
         """Get current parlay payout from bet slip."""
-        bet_slip = self.page.wait_for_selector(self.selectors['bet_slip_container'])
-        if not bet_slip:
-            return 0.0
+        bet_slip = self._loc('bet_slip_container')
+        bet_slip.wait_for()
         
-        # Look for payout amount
-        payout_text = bet_slip.text_content()
+        return self._parse_payout(bet_slip.text_content())
+    
+    @staticmethod
+    def _parse_payout(payout_text: Optional[str]) -> float:
+        """Extract the payout amount from bet slip text."""
         # Match numbers with commas and decimals
-        payout_match = re.search(r'[\d,]+\.?\d*', payout_text)
+        payout_match = _PAYOUT_DEC_RE.search(payout_text or "")
         
         if payout_match:
             # Remove commas and convert to float
-            payout_str = payout_match.group().replace(',', '')
+            payout_str = payout_match.group().translate(_STRIP_COMMA)
             return float(payout_str)
         
         return 0.0
@@ -302,47 +492,39 @@ class FliffAutomator:
         def _place_bet():
             logger.info(f"Placing bet with amount: ${wager_amount:,.2f}")
             
-            # Take screenshot before bet
-            screenshot_path = self.take_bet_screenshot()
-            
             # Enter wager amount
-            wager_input = self.page.wait_for_selector('.risk-amount-input__amount')
+            wager_input = self._loc('wager_input')
             wager_input.click()
             wager_input.fill(str(int(wager_amount)))
             
             # Submit bet
-            submit_button = self.page.wait_for_selector(self.selectors['submit_bet_button'])
-            submit_button.click()
+            self._loc('submit_bet_button').click()
             
             # Wait for confirmation
-            self.page.wait_for_selector(self.selectors['bet_success_confirmation'])
+            self._loc('bet_success_confirmation').wait_for()
             
             logger.info("Bet placed successfully")
             return True
         
         return self._retry_operation(_place_bet, operation_name="place_bet")
     
-    def take_bet_screenshot(self) -> str:
-        """Take screenshot of bet slip before submission."""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        screenshot_path = f"screenshots/bet_slip_{timestamp}.png"
-        
+    def take_bet_screenshot_bytes(self) -> bytes:
+        """Capture the bet slip as in-memory JPEG bytes without touching disk."""
         try:
-            bet_slip = self.page.wait_for_selector(self.selectors['bet_slip_container'])
-            bet_slip.screenshot(path=screenshot_path)
-            logger.info(f"Bet slip screenshot saved: {screenshot_path}")
-            return screenshot_path
+            screenshot = self._loc('bet_slip_container').screenshot(type='jpeg', quality=75)
+            logger.info(f"Bet slip screenshot captured ({len(screenshot)} bytes)")
+            return screenshot
         except Exception as e:
-            logger.error(f"Failed to take bet slip screenshot: {e}")
-            return ""
+            logger.error(f"Failed to capture bet slip screenshot: {e}")
+            return b""
     
     def take_error_screenshot(self) -> str:
         """Take full-page error screenshot."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        screenshot_path = f"screenshots/error_{timestamp}.png"
+        screenshot_path = f"screenshots/error_{timestamp}.jpg"
         
         try:
-            self.page.screenshot(path=screenshot_path, full_page=True)
+            self.page.screenshot(path=screenshot_path, full_page=True, type='jpeg', quality=70)
             logger.info(f"Error screenshot saved: {screenshot_path}")
             return screenshot_path
         except Exception as e:
@@ -363,4 +545,16 @@ class FliffAutomator:
         except Exception as e:
             logger.error(f"Error during browser cleanup: {e}")
         
+        try:
+            if self.playwright:
+                self.playwright.stop()
+        except Exception as e:
+            logger.error(f"Error during Playwright driver cleanup: {e}")
+        
+        self.page = None
+        self.context = None
+        self.browser = None
+        self.playwright = None
+        self._locators.clear()
+        
         logger.info("Browser resources cleaned up")
\ No newline at end of file
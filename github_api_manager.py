@@ -1,7 +1,8 @@
 import os
 import requests
 import logging
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,20 @@ class GitHubAPIManager:
             raise ValueError("GITHUB_TOKEN environment variable is required")
         if not self.github_repository:
             raise ValueError("GITHUB_REPOSITORY environment variable is required")
+        
+        # Shared session keeps the connection to api.github.com alive between calls
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'token {self.github_token}',
+            'Accept': 'application/vnd.github.v3+json'
+        })
+        retry = Retry(
+            total=3,
+            backoff_factor=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET', 'PUT']
+        )
+        self.session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=4))
     
     def disable_workflow(self) -> bool:
         """
@@ -26,34 +41,20 @@ class GitHubAPIManager:
             bool: True if successful, False otherwise
         """
         try:
-            # Get workflow ID from the workflow filename
-            workflows_url = f"https://api.github.com/repos/{self.github_repository}/actions/workflows"
-            headers = {
-                'Authorization': f'token {self.github_token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            
-            # Get all workflows to find our workflow
-            response = requests.get(workflows_url, headers=headers)
-            response.raise_for_status()
+            # Look up the workflow directly by its filename
+            workflow_url = f"https://api.github.com/repos/{self.github_repository}/actions/workflows/{self.workflow_filename}"
+            response = self.session.get(workflow_url)
             
-            workflows = response.json().get('workflows', [])
-            target_workflow = None
-            
-            for workflow in workflows:
-                if workflow.get('path') == f'.github/workflows/{self.workflow_filename}':
-                    target_workflow = workflow
-                    break
-            
-            if not target_workflow:
+            if response.status_code == 404:
                 logger.error(f"Workflow '{self.workflow_filename}' not found")
                 return False
+            response.raise_for_status()
             
-            workflow_id = target_workflow['id']
+            workflow_id = response.json()['id']
             
             # Disable the workflow
             disable_url = f"https://api.github.com/repos/{self.github_repository}/actions/workflows/{workflow_id}/disable"
-            response = requests.put(disable_url, headers=headers)
+            response = self.session.put(disable_url)
             response.raise_for_status()
             
             logger.info(f"Successfully disabled workflow: {self.workflow_filename}")
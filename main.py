@@ -1,41 +1,90 @@
 import os
 import sys
+import json
 import logging
+import queue
 import time
-from datetime import datetime
-from typing import Optional
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
 
 from fliff_automator import FliffAutomator
 from github_api_manager import GitHubAPIManager
 from telegram_notifier import TelegramNotifier
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('fliff_bot.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Reward claim windows in seconds
+DAILY_REWARD_WINDOW = 24 * 60 * 60
+BIHOURLY_REWARD_WINDOW = 2 * 60 * 60
+
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """Balance goal and betting thresholds for a bot run."""
+    goal_balance: float = 10.00
+    min_bet_threshold: float = 1.80
+    min_payout_threshold: float = 50.00
+    max_payout_threshold: float = 100.00
+
 class FliffBotOrchestrator:
     """Main orchestrator for the Fliff betting bot."""
     
-    def __init__(self):
-        self.goal_balance = 10.00
-        self.min_bet_threshold = 1.80
-        self.min_payout_threshold = 50.00
-        self.max_payout_threshold = 100.00
+    def __init__(self, config: BotConfig = BotConfig()):
+        self.config = config
+        self.state_path = os.getenv('FLIFF_STATE_PATH', '.fliff_state.json')
         
         # Initialize components
-        self.automator = FliffAutomator()
+        self.automator = FliffAutomator(min_bet_threshold=config.min_bet_threshold)
         self.github_manager = GitHubAPIManager()
         self.telegram_notifier = TelegramNotifier()
         
         logger.info("Fliff Bot Orchestrator initialized")
     
+    @property
+    def goal_balance(self) -> float:
+        return self.config.goal_balance
+    
+    @property
+    def min_bet_threshold(self) -> float:
+        return self.config.min_bet_threshold
+    
+    @property
+    def min_payout_threshold(self) -> float:
+        return self.config.min_payout_threshold
+    
+    @property
+    def max_payout_threshold(self) -> float:
+        return self.config.max_payout_threshold
+    
+    def _load_state(self) -> dict:
+        """Load persisted reward-claim timestamps, or an empty state if unavailable."""
+        try:
+            with open(self.state_path) as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+    
+    def _reward_windows_open(self) -> bool:
+        """Check whether the daily or bi-hourly reward may be claimable again."""
+        state = self._load_state()
+        now = time.time()
+        return (now - state.get('last_bihourly', 0) >= BIHOURLY_REWARD_WINDOW or
+                now - state.get('last_daily', 0) >= DAILY_REWARD_WINDOW)
+    
+    def _record_reward_claim(self):
+        """Persist the claim time for every reward window that was open."""
+        state = self._load_state()
+        now = time.time()
+        if now - state.get('last_daily', 0) >= DAILY_REWARD_WINDOW:
+            state['last_daily'] = now
+        state['last_bihourly'] = now
+        
+        try:
+            with open(self.state_path, 'w') as state_file:
+                json.dump(state, state_file)
+        except OSError as e:
+            logger.warning(f"Failed to save reward state: {e}")
+    
     def run(self):
         """Main execution method with comprehensive error handling."""
         screenshot_path = None
@@ -43,12 +92,20 @@ class FliffBotOrchestrator:
         try:
             logger.info("Starting Fliff Bot execution")
             
-            # Send initial status update
-            self.telegram_notifier.send_status_update("Bot started execution")
+            # Send the initial status update on the notifier's worker while the browser starts;
+            # Playwright itself stays on this thread since the sync API is not thread-safe
+            notify_future = self.telegram_notifier.submit(
+                self.telegram_notifier.send_status_update, "Bot started execution"
+            )
             
             # Initialize browser and login
             logger.info("Initializing browser and logging in")
             self.automator.login()
+            try:
+                notify_future.result(timeout=10)
+            except FutureTimeoutError:
+                # The start ping is informational; a slow Bot API must not abort the run
+                logger.warning("Initial status update still pending, continuing without it")
             
             # First action: Check if goal is already met
             logger.info("Checking current balance against goal")
@@ -67,19 +124,33 @@ class FliffBotOrchestrator:
             
             # Action Phase 1: Resource Collection
             if balance < self.min_bet_threshold and not has_blocking_wagers:
-                logger.info("Balance below threshold, attempting to collect rewards")
-                self.automator.check_and_claim_rewards()
+                window_open = self._reward_windows_open()
+                rewards_claimed = False
+                if window_open:
+                    logger.info("Balance below threshold, attempting to collect rewards")
+                    rewards_claimed = self.automator.check_and_claim_rewards()
+                else:
+                    logger.info("Balance below threshold but no reward window has reopened since the last claim")
                 
-                # Re-check balance after claiming rewards
-                balance = self.automator.get_balance()
-                logger.info(f"Balance after rewards: ${balance:,.2f}")
+                if rewards_claimed:
+                    # Only a claim that happened closes the windows; an empty page is retried next run
+                    self._record_reward_claim()
+                    
+                    # Re-check balance after claiming rewards from the widget already on screen
+                    balance = self.automator.get_balance_no_nav(previous_balance=balance)
+                    logger.info(f"Balance after rewards: ${balance:,.2f}")
+                elif window_open:
+                    logger.info("No rewards were claimable, leaving the reward windows open")
                 
                 if balance < self.min_bet_threshold:
                     logger.info(f"Balance still below minimum bet threshold (${self.min_bet_threshold:,.2f})")
-                    self.telegram_notifier.send_status_update(
-                        f"Rewards collected but balance still insufficient for betting. "
-                        f"Current balance: ${balance:,.2f}"
-                    )
+                    if rewards_claimed:
+                        status = "Rewards collected but balance still insufficient for betting."
+                    elif window_open:
+                        status = "No rewards were available to claim and balance insufficient for betting."
+                    else:
+                        status = "No reward window open yet and balance insufficient for betting."
+                    self.telegram_notifier.send_status_update(f"{status} Current balance: ${balance:,.2f}")
                     return
             
             # Action Phase 2: Parlay Construction & Betting
@@ -92,8 +163,8 @@ class FliffBotOrchestrator:
                 
                 if bet_placed:
                     logger.info("Bet placed successfully")
-                    # Take screenshot of completed bet slip
-                    screenshot_path = self.automator.take_bet_screenshot()
+                    # Capture the completed bet slip in memory for upload
+                    screenshot_bytes = self.automator.take_bet_screenshot_bytes()
                     
                     # Get final bet details
                     final_balance = self.automator.get_balance()
@@ -102,8 +173,8 @@ class FliffBotOrchestrator:
                     # Send confirmation
                     self.telegram_notifier.send_bet_confirmation(
                         wager_amount=final_balance,
-                        potential_potential_payout=potential_payout,
-                        screenshot_path=screenshot_path
+                        potential_payout=potential_payout,
+                        screenshot_bytes=screenshot_bytes
                     )
                 else:
                     logger.info("No suitable parlay could be constructed")
@@ -122,19 +193,45 @@ class FliffBotOrchestrator:
         finally:
             # Cleanup
             logger.info("Performing cleanup")
+            # Each step gets its own guard so a failing browser close cannot leave the
+            # notifier threads running or the screenshot on disk
             try:
                 self.automator.close()
-                
-                # Clean up screenshot files
+            except Exception as e:
+                logger.error(f"Error closing browser during cleanup: {e}")
+            
+            try:
+                self.telegram_notifier.close()
+            except Exception as e:
+                logger.error(f"Error closing Telegram notifier during cleanup: {e}")
+            
+            try:
+                # Clean up the error screenshot file
                 if screenshot_path and os.path.exists(screenshot_path):
                     os.remove(screenshot_path)
                     logger.info(f"Cleaned up screenshot: {screenshot_path}")
-                    
             except Exception as e:
-                logger.error(f"Error during cleanup: {e}")
+                logger.error(f"Error removing screenshot during cleanup: {e}")
+
+def configure_logging() -> QueueListener:
+    """Queue log records so file and console writes happen on a background thread."""
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = logging.FileHandler('fliff_bot.log')
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Full formatting happens in the listener
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    return listener
 
 def main():
     """Entry point for the Fliff bot."""
+    log_listener = configure_logging()
     try:
         orchestrator = FliffBotOrchestrator()
         orchestrator.run()
@@ -144,6 +241,9 @@ def main():
     except Exception as e:
         logger.error(f"Fatal error in main execution: {e}")
         sys.exit(1)
+    finally:
+        # Flush any queued records before the process exits
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,25 +3,103 @@
 Test runner script for Fliff Bot
 Run all tests with a single command: python run_tests.py
 """
+import os
 import subprocess
 import sys
-import os
 from pathlib import Path
 
+import pytest
+
+
+# Display name, test directory and covered modules for each category, in reporting order
+TEST_CATEGORIES = {
+    "unit": ("Unit Tests", "tests/unit/", ["github_api_manager", "telegram_notifier"]),
+    "integration": ("Integration Tests", "tests/integration/", ["fliff_automator"]),
+    "e2e": ("End-to-End Tests", "tests/e2e/", ["main"]),
+}
 
-def run_command(command, cwd=None):
-    """Run a command and return the result"""
+# Source module -> category whose tests exercise it, used to narrow runs to what changed
+SOURCE_CATEGORIES = {
+    "github_api_manager.py": "unit",
+    "telegram_notifier.py": "unit",
+    "fliff_automator.py": "integration",
+    "main.py": "e2e",
+}
+
+
+class CategoryOutcomes:
+    """pytest plugin recording which test categories had failures in a combined run"""
+    
+    def __init__(self):
+        self.failed = set()
+    
+    def _record(self, report):
+        if report.failed:
+            for category, (_, test_dir, _) in TEST_CATEGORIES.items():
+                if report.nodeid.startswith(test_dir):
+                    self.failed.add(category)
+    
+    def pytest_runtest_logreport(self, report):
+        self._record(report)
+    
+    def pytest_collectreport(self, report):
+        self._record(report)
+
+
+def changed_categories():
+    """Return the categories affected by uncommitted changes, or None to run everything"""
+    # Modified tracked files plus new files git does not know about yet (ignored files excluded)
+    git_commands = (
+        ["git", "diff", "--name-only", "HEAD"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    )
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=cwd
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except Exception as e:
-        return False, "", str(e)
+        changed = [
+            path
+            for command in git_commands
+            for path in subprocess.run(command, capture_output=True, text=True, check=True).stdout.splitlines()
+        ]
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    if not changed:
+        return None
+    
+    affected = set()
+    for path in changed:
+        if path in SOURCE_CATEGORIES:
+            affected.add(SOURCE_CATEGORIES[path])
+            continue
+        
+        category = next((c for c, (_, test_dir, _) in TEST_CATEGORIES.items() if path.startswith(test_dir)), None)
+        if category is None:
+            # Shared fixtures, requirements and the like can affect any category
+            return None
+        affected.add(category)
+    
+    return [category for category in TEST_CATEGORIES if category in affected]
+
+
+def wants_coverage():
+    """Coverage tracing slows every test down, so only measure it on CI or when asked to"""
+    return bool(os.environ.get("CI")) or "--coverage" in sys.argv
+
+
+def build_pytest_args(categories):
+    """Build the pytest arguments for running the given categories in one session"""
+    args = [TEST_CATEGORIES[category][1] for category in categories]
+    # xdist worker count and distribution come from pytest.ini. Output capture stays on: xdist
+    # workers never forward their stdout, so capturing is the only way a failing test's prints
+    # reach the report
+    args += ["--rootdir=.", "-v"]
+    # Run tests that failed last time first so a fix is confirmed as early as possible
+    args.append("--failed-first")
+    if wants_coverage():
+        for category in categories:
+            args += [f"--cov={module}" for module in TEST_CATEGORIES[category][2]]
+        # One report over the whole session; fully covered files are left out of the table
+        args.append("--cov-report=term-missing:skip-covered")
+    return args
 
 
 def print_header(title):
@@ -38,96 +116,60 @@ def print_section(title):
     print(f"{'-'*40}")
 
 
-def run_unit_tests():
-    """Run unit tests"""
-    print_section("Running Unit Tests")
+def run_category(category):
+    """Run a single test category in-process and report the outcome"""
+    name, _, _ = TEST_CATEGORIES[category]
+    label = name.capitalize()
     
-    # Run unit tests with coverage
-    success, stdout, stderr = run_command(
-        "python -m pytest tests/unit/ -v --cov=github_api_manager --cov=telegram_notifier --cov-report=term-missing"
-    )
+    print_section(f"Running {name}")
+    
+    # pytest.main reuses this interpreter, so imports and plugin discovery happen once
+    success = pytest.main(build_pytest_args([category])) == pytest.ExitCode.OK
     
     if success:
-        print("✅ Unit tests passed!")
-        if stdout:
-            print("\nCoverage Report:")
-            print(stdout)
+        print(f"✅ {label} passed!")
     else:
-        print("❌ Unit tests failed!")
-        if stderr:
-            print(f"Error: {stderr}")
-        if stdout:
-            print(f"Output: {stdout}")
+        print(f"❌ {label} failed!")
     
     return success
 
 
+def run_unit_tests():
+    """Run unit tests"""
+    return run_category("unit")
+
+
 def run_integration_tests():
     """Run integration tests"""
-    print_section("Running Integration Tests")
-    
-    # Run integration tests
-    success, stdout, stderr = run_command(
-        "python -m pytest tests/integration/ -v --cov=fliff_automator --cov-report=term-missing"
-    )
-    
-    if success:
-        print("✅ Integration tests passed!")
-        if stdout:
-            print("\nCoverage Report:")
-            print(stdout)
-    else:
-        print("❌ Integration tests failed!")
-        if stderr:
-            print(f"Error: {stderr}")
-        if stdout:
-            print(f"Output: {stdout}")
-    
-    return success
+    return run_category("integration")
 
 
 def run_e2e_tests():
     """Run end-to-end tests"""
-    print_section("Running End-to-End Tests")
-    
-    # Run e2e tests
-    success, stdout, stderr = run_command(
-        "python -m pytest tests/e2e/ -v --cov=main --cov-report=term-missing"
-    )
-    
-    if success:
-        print("✅ End-to-end tests passed!")
-        if stdout:
-            print("\nCoverage Report:")
-            print(stdout)
-    else:
-        print("❌ End-to-end tests failed!")
-        if stderr:
-            print(f"Error: {stderr}")
-        if stdout:
-            print(f"Output: {stdout}")
-    
-    return success
+    return run_category("e2e")
 
 
-def run_all_tests():
-    """Run all tests"""
+def run_all_tests(categories=None):
+    """Run all tests, or only the given categories"""
     print_header("Fliff Bot Test Suite")
-    print("Running comprehensive test suite...")
-    
-    results = []
-    
-    # Run unit tests
-    unit_success = run_unit_tests()
-    results.append(("Unit Tests", unit_success))
+    if categories is None:
+        categories = list(TEST_CATEGORIES)
+        print("Running comprehensive test suite...")
+    else:
+        print(f"Running tests affected by uncommitted changes: {', '.join(categories)}")
     
-    # Run integration tests
-    integration_success = run_integration_tests()
-    results.append(("Integration Tests", integration_success))
+    # Run the selected categories in one in-process session; the plugin attributes failures
+    # back to their category so the summary stays per-category
+    outcomes = CategoryOutcomes()
+    exit_code = pytest.main(build_pytest_args(categories), plugins=[outcomes])
+    session_ok = exit_code in (pytest.ExitCode.OK, pytest.ExitCode.TESTS_FAILED)
     
-    # Run e2e tests
-    e2e_success = run_e2e_tests()
-    results.append(("End-to-End Tests", e2e_success))
+    results = []
+    for category, (name, _, _) in TEST_CATEGORIES.items():
+        if category in categories:
+            results.append((name, session_ok and category not in outcomes.failed))
+        else:
+            print(f"{name}: skipped, nothing it covers has changed")
     
     # Summary
     print_header("Test Summary")
@@ -173,24 +215,28 @@ def show_help():
     print("Usage: python run_tests.py [options]")
     print()
     print("Options:")
-    print("  [no arguments]    Run all tests (default)")
+    print("  [no arguments]    Run tests affected by uncommitted changes (all if none)")
+    print("  --all            Run all tests regardless of what changed")
+    print("  --coverage       Measure coverage (always on when CI is set)")
     print("  unit             Run only unit tests")
     print("  integration      Run only integration tests")
     print("  e2e              Run only end-to-end tests")
     print("  --help, -h       Show this help message")
     print()
     print("Examples:")
-    print("  python run_tests.py              # Run all tests")
+    print("  python run_tests.py              # Run tests for what changed")
+    print("  python run_tests.py --all        # Run all tests")
     print("  python run_tests.py unit         # Run only unit tests")
     print("  python run_tests.py integration  # Run only integration tests")
     print("  python run_tests.py e2e          # Run only end-to-end tests")
+    print("  python run_tests.py unit --coverage  # Run unit tests with coverage")
     print()
     print("The test suite includes:")
     print("  🧪 Unit tests: Test individual components in isolation")
     print("  🔗 Integration tests: Test component interactions")
     print("  🚀 End-to-end tests: Test complete workflows")
     print()
-    print("All tests include coverage reporting and detailed output.")
+    print("Coverage reporting is included on CI or with --coverage.")
 
 
 def main():
@@ -200,12 +246,16 @@ def main():
         print("Error: Please run this script from the fliff-bot directory")
         sys.exit(1)
     
-    # Parse command line arguments
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
+    # Parse command line arguments; --coverage may accompany any of them
+    args = [arg.lower() for arg in sys.argv[1:] if arg.lower() != "--coverage"]
+    if args:
+        arg = args[0]
         if arg in ["--help", "-h"]:
             show_help()
             return
+        elif arg == "--all":
+            success = run_all_tests()
+            sys.exit(0 if success else 1)
         elif arg in ["unit", "integration", "e2e", "end-to-end"]:
             success = run_specific_test_category(arg)
             sys.exit(0 if success else 1)
@@ -214,8 +264,8 @@ def main():
             show_help()
             sys.exit(1)
     
-    # Run all tests by default
-    success = run_all_tests()
+    # By default only run the categories touched by uncommitted changes
+    success = run_all_tests(changed_categories())
     sys.exit(0 if success else 1)
 
 
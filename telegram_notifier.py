@@ -1,12 +1,51 @@
 import os
+import asyncio
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
 from datetime import datetime
 from typing import Optional
 from telegram import Bot, InputFile
 from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
 
 logger = logging.getLogger(__name__)
 
+# Notifications go out back-to-back, so keep a small pool of keep-alive connections
+# instead of paying a TCP+TLS handshake per call
+CONNECTION_POOL_SIZE = 8
+
+# Telegram rejects photo captions longer than this
+CAPTION_LIMIT = 1024
+
+# Upper bound on how long a blocking send waits for the Bot API
+SEND_TIMEOUT = 30.0
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Notification bodies, formatted once per send
+SUCCESS_TEMPLATE = (
+    "🎉 SUCCESS: Fliff Bot Goal Achieved! 🎉\n\n"
+    "Current Balance: ${balance:,.2f}\n"
+    "Goal: $10.00 ✓\n\n"
+    "Time: {timestamp}\n\n"
+    "The bot has been successfully terminated and will not run again until manually re-enabled."
+)
+BET_CONFIRMATION_TEMPLATE = (
+    "🎯 BET PLACED SUCCESSFULLY! 🎯\n\n"
+    "Wager Amount: ${wager_amount:,.2f}\n"
+    "Potential Payout: ${potential_payout:,.2f}\n\n"
+    "Time: {timestamp}"
+)
+ERROR_TEMPLATE = (
+    "❌ ERROR: Fliff Bot Encountered an Issue ❌\n\n"
+    "Error: {error_message}\n\n"
+    "Time: {timestamp}\n\n"
+    "Please check the logs and screenshot for debugging information."
+)
+STATUS_TEMPLATE = "📊 STATUS UPDATE: {timestamp}\n\n{message}"
+
 class TelegramNotifier:
     """Handles all Telegram messaging for the Fliff bot."""
     
@@ -19,7 +58,97 @@ class TelegramNotifier:
         if not self.chat_id:
             raise ValueError("TELEGRAM_CHAT_ID environment variable is required")
         
-        self.bot = Bot(token=self.bot_token)
+        self._request = HTTPXRequest(
+            connection_pool_size=CONNECTION_POOL_SIZE,
+            connect_timeout=5.0,
+            read_timeout=10.0,
+            write_timeout=20.0  # Screenshot uploads need longer than the 5s default
+        )
+        self.bot = Bot(token=self.bot_token, request=self._request)
+        
+        # Bound once so each notification is a direct call rather than an attribute chain
+        self._send_message = self.bot.send_message
+        self._send_photo = self.bot.send_photo
+        self._now = datetime.now
+        
+        # Bot API coroutines run on one long-lived loop so the pooled client stays bound to it;
+        # both the loop and the notification worker are started on first use
+        self._loop = None
+        self._loop_thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the background event loop, starting it on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="telegram-loop", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+    
+    def _call_bot(self, method, **kwargs):
+        """
+        Call a Bot API method, driving it to completion if it returns a coroutine.
+        
+        Args:
+            method: Bound Bot method to call
+            **kwargs: Arguments for the Bot API call
+            
+        Returns:
+            The API call's result
+        """
+        result = method(**kwargs)
+        if asyncio.iscoroutine(result):
+            future = asyncio.run_coroutine_threadsafe(result, self._get_loop())
+            try:
+                result = future.result(timeout=SEND_TIMEOUT)
+            except FutureTimeoutError:
+                # Stop the send on the loop so a late delivery cannot duplicate a fallback message
+                future.cancel()
+                raise
+        return result
+    
+    def submit(self, method, *args, **kwargs) -> Future:
+        """
+        Run a notifier method in the background so the caller is not blocked on network I/O.
+        
+        Submitted calls run one at a time, in order.
+        
+        Args:
+            method: Notifier method to run, e.g. ``notifier.send_status_update``
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+            
+        Returns:
+            Future: Resolves to the method's return value
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telegram")
+            return self._executor.submit(method, *args, **kwargs)
+    
+    def close(self):
+        """Wait for submitted notifications to finish, close the HTTP pool and stop the background threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        
+        with self._lock:
+            loop, self._loop = self._loop, None
+            loop_thread, self._loop_thread = self._loop_thread, None
+        if loop is not None:
+            # Close the pooled client's keep-alive connections on the loop they are bound to
+            try:
+                asyncio.run_coroutine_threadsafe(self._request.shutdown(), loop).result(timeout=SEND_TIMEOUT)
+            except Exception as e:
+                logger.warning("Failed to shut down Telegram HTTP client: %s", e)
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join(timeout=SEND_TIMEOUT)
+            loop.close()
     
     def send_message(self, message: str, parse_mode: Optional[str] = None) -> bool:
         """
@@ -33,7 +162,8 @@ class TelegramNotifier:
             bool: True if successful, False otherwise
         """
         try:
-            self.bot.send_message(
+            self._call_bot(
+                self._send_message,
                 chat_id=self.chat_id,
                 text=message,
                 parse_mode=parse_mode
@@ -41,92 +171,158 @@ class TelegramNotifier:
             logger.info("Message sent successfully to Telegram")
             return True
         except TelegramError as e:
-            logger.error(f"Failed to send Telegram message: {e}")
+            logger.error("Failed to send Telegram message: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error sending Telegram message: {e}")
+            logger.error("Unexpected error sending Telegram message: %s", e)
             return False
     
-    def send_photo(self, photo_path: str, caption: Optional[str] = None) -> bool:
+    def send_photo(self, photo_path: str, caption: Optional[str] = None,
+                   parse_mode: Optional[str] = None) -> bool:
         """
         Send a photo to Telegram with optional caption.
         
         Args:
             photo_path: Path to the photo file
             caption: Optional caption for the photo
+            parse_mode: Optional HTML or Markdown parse mode for the caption
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            if not os.path.exists(photo_path):
-                logger.error(f"Photo file not found: {photo_path}")
+            # Read the screenshot into memory and close it straight away; handing the
+            # library a Path leaves it to open a handle it never closes
+            try:
+                with open(photo_path, 'rb') as photo_file:
+                    photo_bytes = photo_file.read()
+            except FileNotFoundError:
+                logger.error("Photo file not found: %s", photo_path)
                 return False
             
-            with open(photo_path, 'rb') as photo_file:
-                self.bot.send_photo(
-                    chat_id=self.chat_id,
-                    photo=InputFile(photo_file),
-                    caption=caption
-                )
+            # Reject empty captures before they cost a round trip to be refused by Telegram
+            if not photo_bytes:
+                logger.error("Photo file is empty: %s", photo_path)
+                return False
+            
+            self._call_bot(
+                self._send_photo,
+                chat_id=self.chat_id,
+                photo=InputFile(photo_bytes, filename=os.path.basename(photo_path)),
+                caption=caption,
+                parse_mode=parse_mode
+            )
             
-            logger.info(f"Photo sent successfully to Telegram: {photo_path}")
+            logger.info("Photo sent successfully to Telegram: %s", photo_path)
             return True
         except TelegramError as e:
-            logger.error(f"Failed to send Telegram photo: {e}")
+            logger.error("Failed to send Telegram photo: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error sending Telegram photo: {e}")
+            logger.error("Unexpected error sending Telegram photo: %s", e)
             return False
     
-    def send_success_notification(self, balance: float, screenshot_path: Optional[str] = None) -> bool:
+    def send_photo_bytes(self, photo_bytes: bytes, caption: Optional[str] = None,
+                         filename: str = "screenshot.jpg", parse_mode: Optional[str] = None) -> bool:
         """
-        Send success notification when $10.00 goal is reached.
+        Send in-memory image data to Telegram with optional caption.
         
         Args:
-            balance: Current account balance
-            screenshot_path: Optional screenshot path
+            photo_bytes: Encoded image data
+            caption: Optional caption for the photo
+            filename: File name reported to Telegram for the upload
+            parse_mode: Optional HTML or Markdown parse mode for the caption
             
         Returns:
             bool: True if successful, False otherwise
         """
-        message = f"🎉 SUCCESS: Fliff Bot Goal Achieved! 🎉\n\n"
-        message += f"Current Balance: ${balance:,.2f}\n"
-        message += f"Goal: $10.00 ✓\n\n"
-        message += f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        message += "The bot has been successfully terminated and will not run again until manually re-enabled."
+        try:
+            if not photo_bytes:
+                logger.error("Photo data is empty")
+                return False
+            
+            self._call_bot(
+                self._send_photo,
+                chat_id=self.chat_id,
+                photo=InputFile(photo_bytes, filename=filename),
+                caption=caption,
+                parse_mode=parse_mode
+            )
+            
+            logger.info("Photo sent successfully to Telegram: %s", filename)
+            return True
+        except TelegramError as e:
+            logger.error("Failed to send Telegram photo: %s", e)
+            return False
+        except Exception as e:
+            logger.error("Unexpected error sending Telegram photo: %s", e)
+            return False
+    
+    def _send_notification(self, message: str, send_photo=None, photo_caption: Optional[str] = None) -> bool:
+        """
+        Send an HTML notification, attaching the screenshot to the same request when possible.
+        
+        Args:
+            message: The notification text
+            send_photo: Optional callable uploading the screenshot, accepting caption and parse_mode
+            photo_caption: Screenshot caption used when the message is too long to be the caption
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if send_photo is None:
+            return self.send_message(message, parse_mode='HTML')
+        
+        # One round-trip: the message rides along as the photo caption
+        if len(message) <= CAPTION_LIMIT:
+            if send_photo(caption=message, parse_mode='HTML'):
+                return True
+            logger.warning("Screenshot upload failed, sending notification as text only")
+            return self.send_message(message, parse_mode='HTML')
         
         success = self.send_message(message, parse_mode='HTML')
         
-        if screenshot_path and success:
-            success = self.send_photo(screenshot_path, "Final balance screenshot")
+        if success:
+            success = send_photo(caption=photo_caption)
         
         return success
     
-    def send_bet_confirmation(self, wager_amount: float, potential_payout: float, screenshot_path: str) -> bool:
+    def send_success_notification(self, balance: float, screenshot_path: Optional[str] = None) -> bool:
+        """
+        Send success notification when $10.00 goal is reached.
+        
+        Args:
+            balance: Current account balance
+            screenshot_path: Optional screenshot path
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        message = SUCCESS_TEMPLATE.format(balance=balance, timestamp=self._now().strftime(TIMESTAMP_FORMAT))
+        
+        send_photo = partial(self.send_photo, screenshot_path) if screenshot_path else None
+        return self._send_notification(message, send_photo, "Final balance screenshot")
+    
+    def send_bet_confirmation(self, wager_amount: float, potential_payout: float, screenshot_bytes: bytes) -> bool:
         """
         Send bet confirmation with screenshot.
         
         Args:
             wager_amount: Amount wagered
             potential_payout: Potential payout amount
-            screenshot_path: Path to bet slip screenshot
+            screenshot_bytes: In-memory bet slip screenshot
             
         Returns:
             bool: True if successful, False otherwise
         """
-        message = f"🎯 BET PLACED SUCCESSFULLY! 🎯\n\n"
-        message += f"Wager Amount: ${wager_amount:,.2f}\n"
-        message += f"Potential Payout: ${potential_payout:,.2f}\n\n"
-        message += f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        message += "Bet slip screenshot attached below:"
-        
-        success = self.send_message(message, parse_mode='HTML')
-        
-        if success:
-            success = self.send_photo(screenshot_path, "Bet slip confirmation")
+        message = BET_CONFIRMATION_TEMPLATE.format(
+            wager_amount=wager_amount,
+            potential_payout=potential_payout,
+            timestamp=self._now().strftime(TIMESTAMP_FORMAT)
+        )
         
-        return success
+        send_photo = partial(self.send_photo_bytes, screenshot_bytes, filename="bet_slip.jpg") if screenshot_bytes else None
+        return self._send_notification(message, send_photo, "Bet slip confirmation")
     
     def send_error_notification(self, error_message: str, screenshot_path: Optional[str] = None) -> bool:
         """
@@ -139,17 +335,10 @@ class TelegramNotifier:
         Returns:
             bool: True if successful, False otherwise
         """
-        message = f"❌ ERROR: Fliff Bot Encountered an Issue ❌\n\n"
-        message += f"Error: {error_message}\n\n"
-        message += f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        message += "Please check the logs and screenshot for debugging information."
-        
-        success = self.send_message(message, parse_mode='HTML')
+        message = ERROR_TEMPLATE.format(error_message=error_message, timestamp=self._now().strftime(TIMESTAMP_FORMAT))
         
-        if screenshot_path and success:
-            success = self.send_photo(screenshot_path, "Error screenshot")
-        
-        return success
+        send_photo = partial(self.send_photo, screenshot_path) if screenshot_path else None
+        return self._send_notification(message, send_photo, "Error screenshot")
     
     def send_status_update(self, message: str) -> bool:
         """
@@ -161,7 +350,6 @@ class TelegramNotifier:
         Returns:
             bool: True if successful, False otherwise
         """
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        full_message = f"📊 STATUS UPDATE: {timestamp}\n\n{message}"
+        full_message = STATUS_TEMPLATE.format(timestamp=self._now().strftime(TIMESTAMP_FORMAT), message=message)
         
         return self.send_message(full_message, parse_mode='HTML')
\ No newline at end of file
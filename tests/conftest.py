@@ -1,18 +1,67 @@
 """
 Pytest configuration and shared fixtures for Fliff Bot tests
 """
+import copy
 import pytest
-import os
 import sys
-from unittest.mock import Mock, patch
+from datetime import datetime
+from types import MappingProxyType
+from unittest.mock import DEFAULT, Mock, patch
 from pathlib import Path
 
 # Add the parent directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-@pytest.fixture
-def mock_env_vars():
-    """Mock environment variables for testing"""
+# Collaborator classes replaced by mocks when testing the orchestrator in isolation
+COLLABORATOR_PATCHES = {'TelegramNotifier': DEFAULT, 'GitHubAPIManager': DEFAULT, 'FliffAutomator': DEFAULT}
+
+# Happy-path automator behaviour (betting balance, no open wagers, bet placed); tests override
+# only what they exercise. Kept as configuration rather than a copied Mock because copies of a
+# Mock share their child mocks, which would leak call history between tests.
+AUTOMATOR_DEFAULTS = {
+    'get_balance.return_value': 5.00,
+    'check_open_wagers.return_value': False,
+    'execute_betting_strategy.return_value': True,
+    'take_bet_screenshot_bytes.return_value': b"fake screenshot",
+    'get_current_payout.return_value': 75.00,
+    'check_and_claim_rewards.return_value': True
+}
+
+# Wall-clock time seen by the automator, so screenshot filenames are predictable
+FROZEN_NOW = datetime(2023, 12, 1, 12, 0, 0)
+
+# Call-phase time budget (seconds) for the fully mocked unit modules, enforced only with
+# --unit-budget since wall-clock limits flake under coverage tracing or a busy runner;
+# tests marked slow are exempt
+UNIT_TEST_BUDGET = 0.05
+BUDGETED_MODULES = ('test_telegram_notifier.py', 'test_github_api_manager.py')
+
+def pytest_addoption(parser):
+    """Register the opt-in switch for the unit test time budget"""
+    parser.addoption('--unit-budget', action='store_true', default=False,
+                     help=f"fail Telegram/GitHub unit tests whose call phase exceeds {UNIT_TEST_BUDGET * 1000:.0f} ms")
+
+def pytest_configure(config):
+    """Import main up front on xdist workers so the cost lands before any test starts"""
+    if hasattr(config, 'workerinput'):
+        import main  # noqa: F401
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Fail budgeted unit tests that run long, e.g. after a real Bot client or file write creeps back in"""
+    outcome = yield
+    report = outcome.get_result()
+    if not item.config.getoption('unit_budget'):
+        return
+    if (report.when == 'call' and report.passed and item.path.name in BUDGETED_MODULES
+            and item.get_closest_marker('slow') is None and report.duration > UNIT_TEST_BUDGET):
+        report.outcome = 'failed'
+        report.longrepr = (f"{item.nodeid} took {report.duration * 1000:.0f} ms, "
+                           f"over the {UNIT_TEST_BUDGET * 1000:.0f} ms unit test budget")
+
+@pytest.fixture(scope="session", autouse=True)
+def session_env_vars():
+    """Apply the test environment once for the whole session"""
     env_vars = {
         'FLIFF_USERNAME': 'test_user',
         'FLIFF_PASSWORD': 'test_password',
@@ -24,78 +73,182 @@ def mock_env_vars():
         'GEOLOCATION_LONGITUDE': '-74.0060'
     }
     
-    with patch.dict(os.environ, env_vars):
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in env_vars.items():
+            mp.setenv(name, value)
         yield env_vars
 
 @pytest.fixture
-def mock_requests_get():
-    """Mock requests.get for GitHub API calls"""
-    with patch('requests.get') as mock_get:
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            'workflows': [
-                {
-                    'id': 12345,
-                    'path': '.github/workflows/main.yml',
-                    'state': 'active'
-                }
-            ]
-        }
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-        yield mock_get
+def mock_env_vars(session_env_vars, tmp_path, monkeypatch):
+    """Mock environment variables for testing, with a per-test reward state file"""
+    state_path = str(tmp_path / '.fliff_state.json')
+    monkeypatch.setenv('FLIFF_STATE_PATH', state_path)
+    return {**session_env_vars, 'FLIFF_STATE_PATH': state_path}
+
+@pytest.fixture(scope="session")
+def main_mod():
+    """The main module, imported on first use, with its collaborator classes patched out
+    
+    Patching for the whole session keeps real browser and HTTP clients from being built by
+    tests that only care about the orchestrator; tests can still patch them further.
+    """
+    import main
+    with patch.multiple(main, **COLLABORATOR_PATCHES):
+        yield main
+
+@pytest.fixture(scope="session")
+def orchestrator_template(main_mod, session_env_vars):
+    """Orchestrator with patched collaborators, constructed once per session"""
+    return main_mod.FliffBotOrchestrator()
 
 @pytest.fixture
-def mock_requests_put():
-    """Mock requests.put for GitHub API calls"""
-    with patch('requests.put') as mock_put:
-        mock_response = Mock()
-        mock_response.raise_for_status.return_value = None
-        mock_put.return_value = mock_response
-        yield mock_put
+def orchestrator(orchestrator_template, mock_env_vars):
+    """Shallow copy of the orchestrator template with a per-test reward state file"""
+    orchestrator = copy.copy(orchestrator_template)
+    orchestrator.state_path = mock_env_vars['FLIFF_STATE_PATH']
+    return orchestrator
 
 @pytest.fixture
-def mock_telegram_bot():
-    """Mock Telegram bot"""
-    with patch('telegram.Bot') as mock_bot_class:
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
-        yield mock_bot
+def mocked_collaborators(main_mod):
+    """Patch the orchestrator's collaborator classes afresh for one test, keyed by class name"""
+    with patch.multiple(main_mod, **COLLABORATOR_PATCHES) as mocks:
+        yield mocks
+
+@pytest.fixture(scope="class")
+def mocked_orchestrator(orchestrator_template):
+    """Copy of the orchestrator template with collaborator mocks shared across a test class"""
+    from fliff_automator import FliffAutomator
+    orchestrator = copy.copy(orchestrator_template)
+    # Specced so the orchestrator calling a method the automator lacks fails the test
+    orchestrator.automator = Mock(spec_set=FliffAutomator, **AUTOMATOR_DEFAULTS)
+    orchestrator.github_manager = Mock()
+    orchestrator.telegram_notifier = Mock()
+    return orchestrator
+
+def _reset_collaborators(orchestrator):
+    """Clear call history and per-test configuration, then restore the automator defaults"""
+    orchestrator.github_manager.reset_mock(return_value=True, side_effect=True)
+    orchestrator.telegram_notifier.reset_mock(return_value=True, side_effect=True)
+    automator = orchestrator.automator
+    automator.reset_mock(return_value=True, side_effect=True)
+    automator.configure_mock(**AUTOMATOR_DEFAULTS)
 
 @pytest.fixture
-def mock_playwright():
-    """Mock Playwright browser automation"""
-    with patch('fliff_automator.sync_playwright') as mock_playwright:
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        yield {
-            'playwright': mock_playwright_instance,
-            'browser': mock_browser,
-            'context': mock_context,
-            'page': mock_page
-        }
+def orch_env(mocked_orchestrator, mock_env_vars):
+    """Mocked orchestrator unpacked as (orchestrator, automator, notifier, github)
+    
+    The orchestrator is class-scoped, so its collaborator mocks are reset after every test
+    and the reward state file is pointed at the test's own tmp_path.
+    """
+    mocked_orchestrator.state_path = mock_env_vars['FLIFF_STATE_PATH']
+    try:
+        yield (
+            mocked_orchestrator,
+            mocked_orchestrator.automator,
+            mocked_orchestrator.telegram_notifier,
+            mocked_orchestrator.github_manager
+        )
+    finally:
+        _reset_collaborators(mocked_orchestrator)
+
+@pytest.fixture(scope="module")
+def github_manager(session_env_vars):
+    """GitHubAPIManager built once per module; it holds no per-call state"""
+    from github_api_manager import GitHubAPIManager
+    return GitHubAPIManager()
+
+@pytest.fixture(scope="module")
+def notifier_template(session_env_vars):
+    """TelegramNotifier built once per module around a Bot-specced mock"""
+    from telegram import Bot
+    from telegram_notifier import TelegramNotifier
+    with patch('telegram_notifier.Bot', return_value=Mock(spec_set=Bot)):
+        notifier = TelegramNotifier()
+    try:
+        yield notifier
+    finally:
+        notifier.close()
 
 @pytest.fixture
-def sample_workflows_response():
-    """Sample GitHub workflows API response"""
-    return {
-        'workflows': [
-            {
-                'id': 12345,
-                'path': '.github/workflows/main.yml',
-                'state': 'active',
-                'updated_at': '2023-01-01T00:00:00Z'
-            }
-        ]
-    }
+def notifier(notifier_template):
+    """The shared notifier with its bot mock cleared of earlier calls and configuration"""
+    notifier_template.bot.reset_mock(return_value=True, side_effect=True)
+    return notifier_template
+
+@pytest.fixture(scope="session")
+def automator_prototype(session_env_vars):
+    """FliffAutomator built once per session for tests that only call its pure helpers"""
+    from fliff_automator import FliffAutomator
+    return FliffAutomator()
+
+@pytest.fixture
+def automator(automator_prototype):
+    """Shallow copy of the automator prototype with no browser session and an empty locator cache"""
+    automator = copy.copy(automator_prototype)
+    automator.playwright = automator.browser = automator.context = automator.page = None
+    automator._locators = {}
+    return automator
+
+class _FrozenDatetime(datetime):
+    """datetime whose now() always returns FROZEN_NOW"""
+    
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+
+@pytest.fixture(scope="module")
+def frozen_time():
+    """Freeze the automator's clock at FROZEN_NOW for a whole module"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('fliff_automator.datetime', _FrozenDatetime)
+        yield FROZEN_NOW
+
+def _wire_playwright_mocks(mocks):
+    """Chain the Playwright mocks so setup walks sync_playwright -> playwright -> browser -> context -> page"""
+    mocks['sync_playwright'].return_value.start.return_value = mocks['playwright']
+    mocks['playwright'].chromium.launch.return_value = mocks['browser']
+    mocks['browser'].new_context.return_value = mocks['context']
+    mocks['context'].new_page.return_value = mocks['page']
+
+def _reset_playwright_mocks(mocks):
+    """Clear everything a test configured on the Playwright mocks, then restore the chain"""
+    for mock in mocks.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    _wire_playwright_mocks(mocks)
+
+# Built once at import; tests get reset views of the same tree rather than a fresh one
+PLAYWRIGHT_MOCKS = {name: Mock() for name in ('playwright', 'browser', 'context', 'page')}
+
+@pytest.fixture(scope="module")
+def mock_playwright():
+    """Mock Playwright browser automation, keyed by component plus the patched sync_playwright"""
+    mock_sync_playwright = Mock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('fliff_automator.sync_playwright', mock_sync_playwright)
+        mocks = {**PLAYWRIGHT_MOCKS, 'sync_playwright': mock_sync_playwright}
+        _wire_playwright_mocks(mocks)
+        try:
+            yield mocks
+        finally:
+            for mock in PLAYWRIGHT_MOCKS.values():
+                mock.reset_mock(return_value=True, side_effect=True)
+
+@pytest.fixture(autouse=True)
+def reset_shared_mocks(request):
+    """Reset the module-scoped Playwright mocks a test uses so call history does not leak between tests"""
+    if 'mock_playwright' in request.fixturenames:
+        _reset_playwright_mocks(request.getfixturevalue('mock_playwright'))
+    yield
+
+@pytest.fixture(scope="module")
+def sample_workflow_response():
+    """Sample GitHub get-workflow API response, read-only so tests can share it"""
+    return MappingProxyType({
+        'id': 12345,
+        'path': '.github/workflows/main.yml',
+        'state': 'active',
+        'updated_at': '2023-01-01T00:00:00Z'
+    })
 
 @pytest.fixture
 def sample_balance_data():
@@ -2,19 +2,18 @@
 End-to-end tests for FliffBotOrchestrator
 """
 import pytest
-import os
-import sys
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
-from main import FliffBotOrchestrator, main
+import json
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from unittest.mock import ANY, call, patch
 
 
 class TestFliffBotOrchestrator:
     """Test cases for FliffBotOrchestrator class"""
     
-    def test_init_success(self, mock_env_vars):
+    def test_init_success(self, main_mod, mock_env_vars):
         """Test successful initialization"""
-        orchestrator = FliffBotOrchestrator()
+        orchestrator = main_mod.FliffBotOrchestrator()
         
         assert orchestrator.goal_balance == 10.00
         assert orchestrator.min_bet_threshold == 1.80
@@ -26,331 +25,224 @@ class TestFliffBotOrchestrator:
         assert orchestrator.github_manager is not None
         assert orchestrator.telegram_notifier is not None
     
+    def test_init_with_custom_config(self, main_mod, mocked_collaborators, mock_env_vars):
+        """Test that a custom config drives thresholds and is shared with the automator"""
+        config = main_mod.BotConfig(goal_balance=20.00, min_bet_threshold=2.50)
+        orchestrator = main_mod.FliffBotOrchestrator(config)
+        
+        assert orchestrator.goal_balance == 20.00
+        assert orchestrator.min_bet_threshold == 2.50
+        assert orchestrator.min_payout_threshold == 50.00
+        mocked_collaborators['FliffAutomator'].assert_called_once_with(min_bet_threshold=2.50)
+    
+    @patch('main.configure_logging')
     @patch('main.FliffBotOrchestrator.run')
-    def test_main_success(self, mock_run, mock_env_vars):
+    def test_main_success(self, mock_run, mock_configure_logging, main_mod, mock_env_vars):
         """Test main function success"""
-        main()
+        main_mod.main()
         mock_run.assert_called_once()
     
+    @patch('main.configure_logging')
+    @patch('main.FliffBotOrchestrator.run')
+    def test_main_stops_log_listener(self, mock_run, mock_configure_logging, main_mod, mock_env_vars):
+        """Test that main drains the logging queue on exit"""
+        main_mod.main()
+        mock_configure_logging.return_value.stop.assert_called_once()
+    
+    @patch('main.configure_logging')
     @patch('main.FliffBotOrchestrator.run')
     @patch('sys.exit')
-    def test_main_keyboard_interrupt(self, mock_exit, mock_run, mock_env_vars):
+    def test_main_keyboard_interrupt(self, mock_exit, mock_run, mock_configure_logging, main_mod, mock_env_vars):
         """Test main function with keyboard interrupt"""
         mock_run.side_effect = KeyboardInterrupt()
-        main()
+        main_mod.main()
         mock_exit.assert_called_once_with(0)
     
+    @patch('main.configure_logging')
     @patch('main.FliffBotOrchestrator.run')
     @patch('sys.exit')
-    def test_main_exception(self, mock_exit, mock_run, mock_env_vars):
+    def test_main_exception(self, mock_exit, mock_run, mock_configure_logging, main_mod, mock_env_vars):
         """Test main function with exception"""
         mock_run.side_effect = Exception("Test exception")
-        main()
+        main_mod.main()
         mock_exit.assert_called_once_with(1)
     
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_goal_already_met(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test run when goal is already met"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.return_value = 15.00
-        mock_automator.return_value = automator_instance
-        
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
-        
-        # Setup github manager mock
-        github_manager_instance = Mock()
-        mock_github_manager.return_value = github_manager_instance
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
+    @pytest.mark.parametrize("balance,balance_after_rewards,bet_placed,expected", [
+        # Goal already met: report success and disable the workflow
+        (15.00, None, True, {'goal_met': True, 'rewards_claimed': False, 'bet_attempted': False, 'status_updates': [], 'balance_checks': 1}),
+        # Below the betting threshold, rewards do not lift the balance enough
+        (1.00, 1.00, True, {'goal_met': False, 'rewards_claimed': True, 'bet_attempted': False, 'status_updates': [call(ANY)], 'balance_checks': 1}),
+        (1.00, 0.50, True, {'goal_met': False, 'rewards_claimed': True, 'bet_attempted': False, 'status_updates': [call(ANY)], 'balance_checks': 1}),
+        # Enough to bet: the parlay is placed and confirmed, then the wager is read back
+        (5.00, None, True, {'goal_met': False, 'rewards_claimed': False, 'bet_attempted': True, 'status_updates': [], 'balance_checks': 2}),
+        # Enough to bet but no suitable parlay: a status update explains why
+        (5.00, None, False, {'goal_met': False, 'rewards_claimed': False, 'bet_attempted': True, 'status_updates': [call(ANY)], 'balance_checks': 1}),
+    ], ids=["goal_already_met", "below_min_threshold", "below_min_threshold_after_rewards",
+            "sufficient_for_betting", "no_suitable_parlay"])
+    def test_run_scenarios(self, orch_env, balance, balance_after_rewards, bet_placed, expected):
+        """Test the run outcome for each starting balance scenario"""
+        orchestrator, automator, notifier, github = orch_env
+        automator.get_balance.return_value = balance
+        automator.get_balance_no_nav.return_value = balance_after_rewards
+        automator.execute_betting_strategy.return_value = bet_placed
+        
+        # Run the orchestrator
         orchestrator.run()
         
         # Verify behavior
-        automator_instance.get_balance.assert_called_once()
-        notifier_instance.send_success_notification.assert_called_once_with(15.00)
-        github_manager_instance.disable_workflow.assert_called_once()
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_balance_below_min_threshold(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test run when balance is below minimum threshold"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.side_effect = [1.00, 1.00]  # Initial and after rewards
-        automator_instance.check_open_wagers.return_value = False
-        mock_automator.return_value = automator_instance
-        
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
+        assert automator.get_balance.call_count == expected['balance_checks']
+        notifier.submit.assert_called_once_with(notifier.send_status_update, "Bot started execution")
+        assert notifier.send_status_update.call_args_list == expected['status_updates']
+        assert automator.check_and_claim_rewards.called == expected['rewards_claimed']
+        
+        if expected['goal_met']:
+            notifier.send_success_notification.assert_called_once_with(balance)
+            github.disable_workflow.assert_called_once()
+        else:
+            github.disable_workflow.assert_not_called()
+        
+        if expected['bet_attempted']:
+            automator.execute_betting_strategy.assert_called_once_with(
+                min_payout=50.00,
+                max_payout=100.00
+            )
+        else:
+            automator.execute_betting_strategy.assert_not_called()
+        
+        if expected['bet_attempted'] and bet_placed:
+            notifier.send_bet_confirmation.assert_called_once_with(
+                wager_amount=5.00,
+                potential_payout=75.00,
+                screenshot_bytes=b"fake screenshot"
+            )
+            automator.take_bet_screenshot_bytes.assert_called_once()
+        else:
+            notifier.send_bet_confirmation.assert_not_called()
+    
+    def test_run_records_reward_claim(self, orch_env, mock_env_vars):
+        """Test that a reward claim is persisted to the state file"""
+        orchestrator, automator, notifier, github = orch_env
+        automator.get_balance.return_value = 1.00
+        automator.get_balance_no_nav.return_value = 1.00
         
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
         orchestrator.run()
         
-        # Verify behavior
-        automator_instance.check_and_claim_rewards.assert_called_once()
-        # Should have two status updates: initial and insufficient balance
-        assert notifier_instance.send_status_update.call_count == 2
+        automator.get_balance.assert_called_once()
+        automator.get_balance_no_nav.assert_called_once_with(previous_balance=1.00)
+        assert notifier.send_status_update.call_args[0][0].startswith("Rewards collected")
+        with open(mock_env_vars['FLIFF_STATE_PATH']) as state_file:
+            state = json.load(state_file)
+        assert 'last_daily' in state
+        assert 'last_bihourly' in state
     
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_balance_below_min_threshold_after_rewards(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test run when balance is still below minimum after claiming rewards"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.side_effect = [1.00, 0.50]  # Initial and after rewards
-        automator_instance.check_open_wagers.return_value = False
-        mock_automator.return_value = automator_instance
-        
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
+    def test_run_keeps_windows_open_when_nothing_claimed(self, orch_env, mock_env_vars):
+        """Test that a claim attempt that found nothing does not suppress the next attempt"""
+        orchestrator, automator, notifier, github = orch_env
+        automator.get_balance.return_value = 1.00
+        automator.check_and_claim_rewards.return_value = False
         
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
         orchestrator.run()
         
-        # Verify behavior
-        automator_instance.check_and_claim_rewards.assert_called_once()
-        # Should have two status updates: initial and insufficient balance
-        assert notifier_instance.send_status_update.call_count == 2
+        automator.check_and_claim_rewards.assert_called_once()
+        automator.get_balance_no_nav.assert_not_called()
+        assert notifier.send_status_update.call_args[0][0].startswith("No rewards were available")
+        assert orchestrator._load_state() == {}
     
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_balance_sufficient_for_betting(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test run when balance is sufficient for betting"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.side_effect = [5.00, 5.00]  # Initial and final balance
-        automator_instance.check_open_wagers.return_value = False
-        automator_instance.execute_betting_strategy.return_value = True
-        automator_instance.get_current_payout.return_value = 75.00
-        automator_instance.take_bet_screenshot.return_value = "test_screenshot.png"
-        mock_automator.return_value = automator_instance
+    def test_run_skips_rewards_when_windows_closed(self, orch_env, mock_env_vars):
+        """Test that reward collection is skipped when no claim window has reopened"""
+        orchestrator, automator, notifier, github = orch_env
+        now = time.time()
+        with open(mock_env_vars['FLIFF_STATE_PATH'], 'w') as state_file:
+            json.dump({'last_daily': now, 'last_bihourly': now}, state_file)
         
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
+        automator.get_balance.return_value = 1.00
         
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
         orchestrator.run()
         
-        # Verify behavior
-        automator_instance.execute_betting_strategy.assert_called_once_with(
-            min_payout=50.00,
-            max_payout=100.00
-        )
-        notifier_instance.send_bet_confirmation.assert_called_once_with(
-            wager_amount=5.00,
-            potential_potential_payout=75.00,
-            screenshot_path="test_screenshot.png"
-        )
-        automator_instance.take_bet_screenshot.assert_called_once()
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_no_suitable_parlay(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test run when no suitable parlay can be constructed"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.side_effect = [5.00, 5.00]  # Initial and final balance
-        automator_instance.check_open_wagers.return_value = False
-        automator_instance.execute_betting_strategy.return_value = False
-        mock_automator.return_value = automator_instance
-        
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
-        orchestrator.run()
-        
-        # Verify behavior
-        # Should have two status updates: initial and no suitable parlay
-        assert notifier_instance.send_status_update.call_count == 2
+        automator.check_and_claim_rewards.assert_not_called()
+        automator.get_balance.assert_called_once()
+        status = notifier.send_status_update.call_args[0][0]
+        assert status.startswith("No reward window open yet")
+        assert "Rewards collected" not in status
     
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_with_blocking_wagers(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
+    def test_run_with_blocking_wagers(self, orch_env):
         """Test run when there are blocking wagers"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.return_value = 5.00
-        automator_instance.check_open_wagers.return_value = True
-        mock_automator.return_value = automator_instance
+        orchestrator, automator, notifier, github = orch_env
+        automator.check_open_wagers.return_value = True
         
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
+        # Run the orchestrator
         orchestrator.run()
         
         # Verify no betting was attempted
-        automator_instance.execute_betting_strategy.assert_not_called()
+        automator.execute_betting_strategy.assert_not_called()
         # Should have initial status update
-        mock_telegram_notifier.return_value.send_status_update.assert_called_with("Bot started execution")
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_with_exception(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test run when an exception occurs"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.side_effect = Exception("Test exception")
-        automator_instance.take_error_screenshot.return_value = "error_screenshot.png"
-        mock_automator.return_value = automator_instance
-        
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
-        orchestrator.run()
-        
-        # Verify behavior
-        notifier_instance.send_error_notification.assert_called_once_with(
-            "Test exception",
-            "error_screenshot.png"
-        )
-        automator_instance.take_error_screenshot.assert_called_once()
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_cleanup_always_called(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test that cleanup is always called"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.return_value = 15.00
-        mock_automator.return_value = automator_instance
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
-        orchestrator.run()
-        
-        # Verify cleanup was called
-        automator_instance.close.assert_called_once()
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_cleanup_with_exception(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test that cleanup is called even when an exception occurs during cleanup"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.side_effect = Exception("Test exception")
-        automator_instance.take_error_screenshot.return_value = "error_screenshot.png"
-        automator_instance.close.side_effect = Exception("Cleanup failed")
-        mock_automator.return_value = automator_instance
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
+        notifier.submit.assert_called_once_with(notifier.send_status_update, "Bot started execution")
+    
+    @pytest.mark.parametrize("scenario", ["happy", "balance_err", "close_err", "screenshot_missing"])
+    @patch('main.os.remove')
+    @patch('main.os.path.exists')
+    def test_cleanup_invariants(self, mock_exists, mock_remove, orch_env, scenario):
+        """Test that cleanup always runs and errors are reported with a screenshot"""
+        orchestrator, automator, notifier, github = orch_env
+        mock_exists.return_value = scenario != "screenshot_missing"
+        if scenario == "happy":
+            automator.get_balance.return_value = 15.00
+        else:
+            automator.get_balance.side_effect = Exception("Test exception")
+            automator.take_error_screenshot.return_value = "error_screenshot.png"
+        if scenario == "close_err":
+            automator.close.side_effect = Exception("Cleanup failed")
+        
+        # Run the orchestrator
         orchestrator.run()
         
-        # Verify cleanup was attempted despite exception
-        automator_instance.close.assert_called_once()
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_screenshot_cleanup(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars, tmp_path):
-        """Test that screenshots are cleaned up after execution"""
-        # Setup automator mock
-        screenshot_path = str(tmp_path / "test_screenshot.png")
-        automator_instance = Mock()
-        automator_instance.get_balance.return_value = 5.00
-        automator_instance.check_open_wagers.return_value = False
-        automator_instance.execute_betting_strategy.return_value = True
-        automator_instance.get_current_payout.return_value = 75.00
-        automator_instance.take_bet_screenshot.return_value = screenshot_path
-        mock_automator.return_value = automator_instance
-        
-        # Create the screenshot file
-        screenshot_file = tmp_path / "test_screenshot.png"
-        screenshot_file.write_text("fake screenshot")
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
-        orchestrator.run()
-        
-        # Verify screenshot file was cleaned up
-        assert not screenshot_file.exists()
-    
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_screenshot_cleanup_file_not_found(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test that cleanup handles missing screenshot files gracefully"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.return_value = 5.00
-        automator_instance.check_open_wagers.return_value = False
-        automator_instance.execute_betting_strategy.return_value = True
-        automator_instance.get_current_payout.return_value = 75.00
-        automator_instance.take_bet_screenshot.return_value = "nonexistent_screenshot.png"
-        mock_automator.return_value = automator_instance
+        # Every cleanup step runs in every scenario, even when closing the browser fails
+        automator.close.assert_called_once()
+        notifier.close.assert_called_once()
+        
+        if scenario == "happy":
+            notifier.send_error_notification.assert_not_called()
+            automator.take_error_screenshot.assert_not_called()
+        else:
+            notifier.send_error_notification.assert_called_once_with(
+                "Test exception",
+                "error_screenshot.png"
+            )
+            automator.take_error_screenshot.assert_called_once()
+        
+        # The screenshot is removed only when one was taken and is still on disk
+        if scenario in ("balance_err", "close_err"):
+            mock_remove.assert_called_once_with("error_screenshot.png")
+        else:
+            mock_remove.assert_not_called()
+    
+    def test_run_initial_status_update(self, orch_env):
+        """Test that initial status update is sent"""
+        orchestrator, automator, notifier, github = orch_env
         
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
+        # Run the orchestrator
         orchestrator.run()
         
-        # Verify cleanup was attempted without error
-        automator_instance.close.assert_called_once()
+        # Verify initial status update was sent
+        notifier.submit.assert_called_once_with(notifier.send_status_update, "Bot started execution")
+        notifier.close.assert_called_once()
     
-    @patch('main.TelegramNotifier')
-    @patch('main.GitHubAPIManager')
-    @patch('main.FliffAutomator')
-    def test_run_initial_status_update(self, mock_automator, mock_github_manager, mock_telegram_notifier, mock_env_vars):
-        """Test that initial status update is sent"""
-        # Setup automator mock
-        automator_instance = Mock()
-        automator_instance.get_balance.return_value = 5.00
-        automator_instance.check_open_wagers.return_value = False
-        automator_instance.execute_betting_strategy.return_value = True
-        automator_instance.get_current_payout.return_value = 75.00
-        automator_instance.take_bet_screenshot.return_value = "test_screenshot.png"
-        mock_automator.return_value = automator_instance
+    def test_run_continues_when_initial_status_is_slow(self, orch_env):
+        """Test that a start notification still pending after the wait does not abort the run"""
+        orchestrator, automator, notifier, github = orch_env
+        notifier.submit.return_value.result.side_effect = FutureTimeoutError()
         
-        # Setup notifier mock
-        notifier_instance = Mock()
-        mock_telegram_notifier.return_value = notifier_instance
-        
-        # Create orchestrator and run
-        orchestrator = FliffBotOrchestrator()
         orchestrator.run()
         
-        # Verify initial status update was sent
-        notifier_instance.send_status_update.assert_called_with("Bot started execution")
-    
-    def test_goal_balance_property(self, mock_env_vars):
-        """Test goal_balance property"""
-        orchestrator = FliffBotOrchestrator()
-        assert orchestrator.goal_balance == 10.00
-    
-    def test_min_bet_threshold_property(self, mock_env_vars):
-        """Test min_bet_threshold property"""
-        orchestrator = FliffBotOrchestrator()
-        assert orchestrator.min_bet_threshold == 1.80
-    
-    def test_min_payout_threshold_property(self, mock_env_vars):
-        """Test min_payout_threshold property"""
-        orchestrator = FliffBotOrchestrator()
-        assert orchestrator.min_payout_threshold == 50.00
-    
-    def test_max_payout_threshold_property(self, mock_env_vars):
-        """Test max_payout_threshold property"""
-        orchestrator = FliffBotOrchestrator()
-        assert orchestrator.max_payout_threshold == 100.00
\ No newline at end of file
+        automator.execute_betting_strategy.assert_called_once()
+        notifier.send_error_notification.assert_not_called()
+    
+    @pytest.mark.parametrize("attr,expected", [
+        ("goal_balance", 10.00),
+        ("min_bet_threshold", 1.80),
+        ("min_payout_threshold", 50.00),
+        ("max_payout_threshold", 100.00),
+    ])
+    def test_threshold_properties(self, orchestrator, attr, expected):
+        """Test that the threshold properties expose the default config"""
+        assert getattr(orchestrator, attr) == expected
\ No newline at end of file
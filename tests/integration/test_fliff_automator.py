@@ -3,10 +3,32 @@ Integration tests for FliffAutomator
 """
 import pytest
 import os
-import re
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
-from fliff_automator import FliffAutomator
+from dataclasses import dataclass
+from unittest.mock import Mock, patch
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from fliff_automator import FliffAutomator, _OPEN_PAYOUTS_JS, _SELECTORS, _PAYOUT_DEC_RE, _STRIP_MONEY
+
+# No test in this module may start a real browser, and the clock is frozen for predictable
+# screenshot names; tests that inspect the mocks request them by name
+pytestmark = pytest.mark.usefixtures('mock_playwright', 'frozen_time')
+
+
+@dataclass(slots=True, frozen=True)
+class _FakeElement:
+    """Stand-in for a page element the test reads but never asserts on"""
+    text: str = ""
+    
+    def text_content(self):
+        return self.text
+    
+    def wait_for(self, **kwargs):
+        pass
+
+
+def _selector_waits(**elements):
+    """wait_for_selector side effect returning the element registered for each named selector"""
+    by_selector = {_SELECTORS[name]: element for name, element in elements.items()}
+    return lambda selector, **kwargs: by_selector.get(selector)
 
 
 class TestFliffAutomator:
@@ -28,6 +50,9 @@ class TestFliffAutomator:
         assert 'balance_container' in automator.selectors
         assert 'bet_slip_container' in automator.selectors
         assert 'submit_bet_button' in automator.selectors
+        
+        # Selectors are a shared module-level constant, not rebuilt per instance
+        assert automator.selectors is FliffAutomator().selectors
     
     def test_init_with_custom_geolocation(self):
         """Test initialization with custom geolocation"""
@@ -39,24 +64,17 @@ class TestFliffAutomator:
             assert automator.latitude == 34.0522
             assert automator.longitude == -118.2437
     
-    @patch('fliff_automator.sync_playwright')
-    def test_setup_browser_success(self, mock_sync_playwright, mock_env_vars):
+    def test_setup_browser_success(self, mock_playwright, mock_env_vars, automator):
         """Test successful browser setup"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
+        mock_playwright_instance = mock_playwright['playwright']
+        mock_browser = mock_playwright['browser']
+        mock_context = mock_playwright['context']
+        mock_page = mock_playwright['page']
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        automator = FliffAutomator()
         automator._setup_browser()
         
         # Verify browser components were set up
+        assert automator.playwright == mock_playwright_instance
         assert automator.browser == mock_browser
         assert automator.context == mock_context
         assert automator.page == mock_page
@@ -69,7 +87,13 @@ class TestFliffAutomator:
                 '--disable-dev-shm-usage',
                 '--disable-gpu',
                 '--disable-extensions',
-                '--disable-notifications'
+                '--disable-notifications',
+                '--disable-background-timer-throttling',
+                '--disable-backgrounding-occluded-windows',
+                '--disable-renderer-backgrounding',
+                '--disable-ipc-flooding-protection',
+                '--disable-features=TranslateUI',
+                '--blink-settings=imagesEnabled=false'
             ]
         )
         
@@ -80,474 +104,455 @@ class TestFliffAutomator:
             geolocation={'latitude': 40.7128, 'longitude': -74.0060},
             permissions=['geolocation']
         )
+        mock_context.route.assert_called_once_with("**/*", FliffAutomator._route_resource)
         
         # Verify page creation and timeout setting
         mock_context.new_page.assert_called_once()
         mock_page.set_default_timeout.assert_called_once_with(30000)
     
-    @patch('fliff_automator.sync_playwright')
-    def test_setup_browser_failure(self, mock_sync_playwright, mock_env_vars):
+    def test_setup_browser_reuses_driver_and_browser(self, mock_playwright, mock_env_vars, automator):
+        """Test that repeated setup only creates a new context"""
+        mock_playwright_instance = mock_playwright['playwright']
+        mock_browser = mock_playwright['browser']
+        
+        automator._setup_browser()
+        automator._setup_browser()
+        
+        mock_playwright['sync_playwright'].return_value.start.assert_called_once()
+        mock_playwright_instance.chromium.launch.assert_called_once()
+        assert mock_browser.new_context.call_count == 2
+        # The first session's context is closed before the second one opens
+        mock_playwright['context'].close.assert_called_once()
+    
+    @pytest.mark.parametrize("resource_type,url,blocked", [
+        ("image", "https://fliff.com/logo.png", True),
+        ("font", "https://fliff.com/font.woff2", True),
+        ("media", "https://fliff.com/intro.mp4", True),
+        ("stylesheet", "https://fliff.com/app.css", False),
+        ("document", "https://fliff.com/login", False),
+        ("xhr", "https://fliff.com/api/balance", False),
+        ("script", "https://www.google-analytics.com/analytics.js", True),
+        ("xhr", "https://api.segment.io/v1/t", True)
+    ])
+    def test_route_resource(self, resource_type, url, blocked):
+        """Test that only non-essential resource types and trackers are aborted"""
+        mock_route = Mock()
+        mock_route.request.resource_type = resource_type
+        mock_route.request.url = url
+        
+        FliffAutomator._route_resource(mock_route)
+        
+        assert mock_route.abort.called is blocked
+        assert mock_route.continue_.called is not blocked
+    
+    def test_setup_browser_load_static_skips_routing(self, mock_playwright, mock_env_vars, monkeypatch, automator):
+        """Test that FLIFF_LOAD_STATIC=1 leaves every request unrouted"""
+        monkeypatch.setenv('FLIFF_LOAD_STATIC', '1')
+        
+        automator._setup_browser()
+        
+        mock_playwright['context'].route.assert_not_called()
+    
+    def test_setup_browser_failure(self, mock_playwright, mock_env_vars, automator):
         """Test browser setup failure"""
         # Mock Playwright failure
-        mock_sync_playwright.return_value.start.side_effect = Exception("Browser launch failed")
-        
-        automator = FliffAutomator()
+        mock_playwright['sync_playwright'].return_value.start.side_effect = Exception("Browser launch failed")
         
         with pytest.raises(Exception, match="Browser launch failed"):
             automator._setup_browser()
     
-    @patch('fliff_automator.sync_playwright')
-    def test_login_success(self, mock_sync_playwright, mock_env_vars):
+    def test_login_success(self, mock_playwright, mock_env_vars, automator):
         """Test successful login"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        mock_page = mock_playwright['page']
         
         # Mock page elements and interactions
         mock_login_button = Mock()
-        mock_page.wait_for_selector.return_value = mock_login_button
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.wait_for_selector.side_effect = _selector_waits(login_button=mock_login_button)
         
-        automator = FliffAutomator()
         # Inject mock page
         automator.page = mock_page
         automator.login()
         
-        # Verify login sequence - allow 1 or 2 clicks (login + optional location prompt)
+        # Verify login sequence; no location prompt is shown
         mock_page.goto.assert_called_once_with("https://fliff.com/login")
         mock_page.fill.assert_any_call('input[type="text"]', 'test_user')
         mock_page.fill.assert_any_call('input[type="password"]', 'test_password')
-        assert mock_login_button.click.call_count >= 1
+        mock_login_button.click.assert_called_once()
         
         # Since we're injecting a mock page, Playwright setup shouldn't be called
-        mock_sync_playwright.return_value.start.assert_not_called()
+        mock_playwright['sync_playwright'].return_value.start.assert_not_called()
     
-    @patch('fliff_automator.sync_playwright')
-    def test_login_with_location_prompt(self, mock_sync_playwright, mock_env_vars):
+    def test_login_with_location_prompt(self, mock_playwright, mock_env_vars, automator):
         """Test login with location prompt handling"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        mock_page = mock_playwright['page']
         
         # Mock page elements and interactions
         mock_login_button = Mock()
         mock_location_continue = Mock()
-        mock_page.wait_for_selector.side_effect = [mock_login_button, mock_location_continue]
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.wait_for_selector.side_effect = _selector_waits(
+            login_button=mock_login_button,
+            location_continue=mock_location_continue
+        )
         
-        automator = FliffAutomator()
         automator.login()
         
         # Verify location prompt was handled
+        mock_login_button.click.assert_called_once()
         mock_location_continue.click.assert_called_once()
     
-    @patch('fliff_automator.sync_playwright')
-    def test_get_balance_success(self, mock_sync_playwright, mock_env_vars):
+    def test_get_balance_success(self, mock_playwright, mock_env_vars, automator):
         """Test successful balance retrieval"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        mock_page = mock_playwright['page']
         
         # Mock balance element
         mock_balance_element = Mock()
         mock_balance_element.text_content.return_value = "$5.50"
-        mock_page.wait_for_selector.return_value = mock_balance_element
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.locator.return_value = mock_balance_element
         
-        automator = FliffAutomator()
         # Inject mock page
         automator.page = mock_page
         balance = automator.get_balance()
         
         assert balance == 5.50
-        mock_page.click.assert_called_with('div.nav-account')
+        mock_page.click.assert_called_with(_SELECTORS['nav_account'])
         mock_balance_element.text_content.assert_called_once()
     
-    @patch('fliff_automator.sync_playwright')
-    def test_get_balance_with_commas(self, mock_sync_playwright, mock_env_vars):
+    def test_get_balance_with_commas(self, mock_playwright, mock_env_vars, automator):
         """Test balance retrieval with comma formatting"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        mock_page = mock_playwright['page']
         
         # Mock balance element with comma
-        mock_balance_element = Mock()
-        mock_balance_element.text_content.return_value = "$1,000.50"
-        mock_page.wait_for_selector.return_value = mock_balance_element
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.locator.return_value = _FakeElement("$1,000.50")
         
-        automator = FliffAutomator()
         automator.page = mock_page
         balance = automator.get_balance()
         
         assert balance == 1000.50
     
-    @patch('fliff_automator.sync_playwright')
-    def test_check_open_wagers_no_wagers(self, mock_sync_playwright, mock_env_vars):
-        """Test checking open wagers when none exist"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
+    def test_strip_money_table(self):
+        """Test that the currency translation table removes dollar signs and separators together"""
+        assert "$1,000.50".translate(_STRIP_MONEY) == "1000.50"
+    
+    def test_get_balance_no_nav_reads_widget_in_place(self, mock_env_vars, automator):
+        """Test that an on-screen balance widget is read without navigating"""
+        mock_page = Mock()
+        mock_page.query_selector.return_value = _FakeElement(" $2,500.25 ")
+        
+        automator.page = mock_page
+        
+        assert automator.get_balance_no_nav() == 2500.25
+        mock_page.click.assert_not_called()
+    
+    @patch('fliff_automator.expect')
+    def test_get_balance_no_nav_waits_for_update(self, mock_expect, mock_env_vars, automator):
+        """Test that a widget still showing the previous balance is re-read once it updates"""
         mock_page = Mock()
+        mock_page.query_selector.return_value = _FakeElement("$1.00")
+        mock_page.locator.return_value.first.text_content.return_value = "$2.50"
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        automator.page = mock_page
+        
+        assert automator.get_balance_no_nav(previous_balance=1.00) == 2.50
+        mock_expect.return_value.not_to_have_text.assert_called_once_with("$1.00", timeout=5000)
+        mock_page.click.assert_not_called()
+    
+    @patch('fliff_automator.expect')
+    def test_get_balance_no_nav_stale_falls_back_to_navigation(self, mock_expect, mock_env_vars, automator):
+        """Test that a widget that never updates is replaced by a fresh read from the account page"""
+        mock_page = Mock()
+        mock_page.query_selector.return_value = _FakeElement("$1.00")
+        mock_expect.return_value.not_to_have_text.side_effect = AssertionError("still $1.00")
+        
+        automator.page = mock_page
+        
+        with patch.object(automator, 'get_balance', return_value=1.00) as mock_get_balance:
+            assert automator.get_balance_no_nav(previous_balance=1.00) == 1.00
+        mock_get_balance.assert_called_once()
+    
+    def test_get_balance_no_nav_falls_back_to_navigation(self, mock_env_vars, automator):
+        """Test that a missing balance widget falls back to get_balance"""
+        mock_page = Mock()
+        mock_page.query_selector.return_value = None
+        
+        automator.page = mock_page
+        
+        with patch.object(automator, 'get_balance', return_value=3.25) as mock_get_balance:
+            assert automator.get_balance_no_nav() == 3.25
+        mock_get_balance.assert_called_once()
+    
+    def test_check_open_wagers_no_wagers(self, mock_playwright, mock_env_vars, automator):
+        """Test checking open wagers when none exist"""
+        mock_page = mock_playwright['page']
         
         # Mock no bet slips found
-        mock_page.query_selector_all.return_value = []
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.eval_on_selector_all.return_value = []
         
-        automator = FliffAutomator()
         automator.page = mock_page
         has_wagers = automator.check_open_wagers()
         
         assert has_wagers is False
         mock_page.click.assert_called_with('a[href="/activity"]')
+        mock_page.wait_for_url.assert_called_with("**/activity*")
     
-    @patch('fliff_automator.sync_playwright')
-    def test_check_open_wagers_with_blocking_wager(self, mock_sync_playwright, mock_env_vars):
-        """Test checking open wagers with blocking wager"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
+    def test_wait_for_optional_timeout(self, mock_env_vars, automator):
+        """Test that a missing optional element returns False instead of raising"""
         mock_page = Mock()
+        mock_page.locator.return_value.first.wait_for.side_effect = PlaywrightTimeoutError("Timeout")
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        automator.page = mock_page
+        
+        assert automator._wait_for_optional('open_bet_slips', timeout=100) is False
+        mock_page.locator.return_value.first.wait_for.assert_called_once_with(state='attached', timeout=100)
+    
+    def test_wait_for_optional_default_probe(self, mock_env_vars, automator):
+        """Test that optional elements get a few seconds to render before being treated as absent"""
+        mock_page = Mock()
+        automator.page = mock_page
+        
+        assert automator._wait_for_optional('open_bet_slips') is True
+        mock_page.locator.return_value.first.wait_for.assert_called_once_with(state='attached', timeout=3000)
+    
+    def test_navigate_waits_for_route(self, mock_env_vars, automator):
+        """Test that in-app navigation waits for the client-side route instead of a page load"""
+        mock_page = Mock()
+        automator.page = mock_page
+        
+        automator._navigate('/rewards')
+        
+        mock_page.click.assert_called_once_with('a[href="/rewards"]')
+        mock_page.wait_for_url.assert_called_once_with("**/rewards*")
+        mock_page.wait_for_load_state.assert_not_called()
+    
+    def test_check_open_wagers_with_blocking_wager(self, mock_playwright, mock_env_vars, automator):
+        """Test checking open wagers with blocking wager"""
+        mock_page = mock_playwright['page']
         
         # Mock bet slip with high payout
-        mock_bet_slip = Mock()
-        mock_bet_slip.text_content.return_value = "Potential payout: $50.00"
-        mock_page.query_selector_all.return_value = [mock_bet_slip]
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.eval_on_selector_all.return_value = ["$50.00"]
         
-        automator = FliffAutomator()
         automator.page = mock_page
         has_wagers = automator.check_open_wagers()
         
         assert has_wagers is True
+        # All slips are read in one round-trip
+        mock_page.eval_on_selector_all.assert_called_once_with('.bet-slip', _OPEN_PAYOUTS_JS, "[class*='payout']")
+        mock_page.query_selector_all.assert_not_called()
     
-    @patch('fliff_automator.sync_playwright')
-    def test_check_open_wagers_no_blocking_wager(self, mock_sync_playwright, mock_env_vars):
-        """Test checking open wagers with no blocking wager"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
+    def test_check_open_wagers_ignores_unlabelled_amounts(self, mock_env_vars, automator):
+        """Test that slips without a payout element (e.g. only a stake) are not treated as blocking"""
         mock_page = Mock()
+        mock_page.eval_on_selector_all.return_value = [None, "$1.00"]
+        
+        automator.page = mock_page
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        assert automator.check_open_wagers() is False
+    
+    def test_check_open_wagers_no_blocking_wager(self, mock_playwright, mock_env_vars, automator):
+        """Test checking open wagers with no blocking wager"""
+        mock_page = mock_playwright['page']
         
         # Mock bet slip with low payout
-        mock_bet_slip = Mock()
-        mock_bet_slip.text_content.return_value = "Potential payout: $1.50"
-        mock_page.query_selector_all.return_value = [mock_bet_slip]
-        mock_page.wait_for_load_state.return_value = None
+        mock_page.eval_on_selector_all.return_value = ["$1.50"]
         
-        automator = FliffAutomator()
         automator.page = mock_page
         has_wagers = automator.check_open_wagers()
         
         assert has_wagers is False
     
-    def test_convert_odds_to_decimal_positive(self):
-        """Test conversion of positive odds to decimal"""
-        automator = FliffAutomator()
+    @patch('fliff_automator.expect')
+    def test_check_and_claim_rewards_batched(self, mock_expect, mock_env_vars, automator):
+        """Test that reward buttons are claimed with a single evaluate call"""
+        mock_page = Mock()
+        mock_page.evaluate.return_value = 3
         
-        # Test positive odds
-        decimal_odds = automator._convert_odds_to_decimal("+150")
-        assert decimal_odds == 2.5
+        automator.page = mock_page
+        assert automator.check_and_claim_rewards() is True
+        
+        mock_page.click.assert_any_call('a[href="/shop"]')
+        mock_page.click.assert_any_call('a[href="/rewards"]')
+        mock_page.evaluate.assert_called_once()
+        assert mock_page.evaluate.call_args[0][1] == ".claim-button"
+        # The shop claim waits for the button to disappear instead of sleeping
+        mock_expect.return_value.to_be_hidden.assert_called_once_with(timeout=5000)
+    
+    def test_check_and_claim_rewards_nothing_claimable(self, mock_env_vars, automator):
+        """Test that an empty shop and rewards page reports that nothing was claimed"""
+        mock_page = Mock()
+        mock_page.locator.return_value.first.wait_for.side_effect = PlaywrightTimeoutError("Timeout")
+        mock_page.evaluate.return_value = 0
         
-        decimal_odds = automator._convert_odds_to_decimal("+100")
-        assert decimal_odds == 2.0
+        automator.page = mock_page
         
-        decimal_odds = automator._convert_odds_to_decimal("+200")
-        assert decimal_odds == 3.0
+        assert automator.check_and_claim_rewards() is False
     
-    def test_convert_odds_to_decimal_negative(self):
-        """Test conversion of negative odds to decimal"""
-        automator = FliffAutomator()
-        # Test negative odds
-        decimal_odds = automator._convert_odds_to_decimal("-150")
-        assert decimal_odds == pytest.approx(1.6667, abs=0.0001)
+    @patch('fliff_automator.expect')
+    def test_execute_betting_strategy_batched_extraction(self, mock_expect, mock_env_vars, automator):
+        """Test that odds are extracted in one evaluate call and only safe picks are clicked"""
+        mock_page = Mock()
+        mock_page.evaluate.return_value = [
+            {'gi': 0, 'pi': 0, 'odds': '-150'},
+            {'gi': 0, 'pi': 1, 'odds': None},
+            {'gi': 1, 'pi': 0, 'odds': '+130'}
+        ]
         
-        decimal_odds = automator._convert_odds_to_decimal("-200")
-        assert decimal_odds == 1.5
+        game_cards = mock_page.locator.return_value
+        game_cards.text_content.return_value = "Potential payout: $60.00"
         
-        decimal_odds = automator._convert_odds_to_decimal("-250")
-        assert decimal_odds == 1.4
+        automator.page = mock_page
+        result = automator.execute_betting_strategy(min_payout=50.0, max_payout=100.0)
+        
+        assert result is True
+        mock_page.evaluate.assert_called_once()
+        # The bet slip is read without a per-selection wait
+        game_cards.wait_for.assert_not_called()
+        game_cards.nth.assert_called_once_with(0)
+        game_cards.nth.return_value.locator.return_value.nth.assert_called_once_with(0)
+        # The first selection waits for a payout figure to appear on the slip
+        mock_expect.assert_called_once_with(game_cards)
+        mock_expect.return_value.to_contain_text.assert_called_once()
     
-    def test_convert_odds_to_decimal_decimal(self):
-        """Test conversion of decimal odds"""
-        automator = FliffAutomator()
+    def test_expect_settled_tolerates_timeout(self):
+        """Test that a timed-out expect assertion is logged and not raised"""
+        def _timed_out():
+            raise AssertionError("Locator expected to be hidden")
         
-        # Test decimal odds
-        decimal_odds = automator._convert_odds_to_decimal("2.5")
-        assert decimal_odds == 2.5
+        assert FliffAutomator._expect_settled(_timed_out, "button to disappear") is False
+        assert FliffAutomator._expect_settled(lambda: None, "button to disappear") is True
+    
+    def test_execute_betting_strategy_no_games(self, mock_env_vars, automator):
+        """Test betting strategy when no proposals are on the page"""
+        mock_page = Mock()
+        mock_page.evaluate.return_value = []
         
-        decimal_odds = automator._convert_odds_to_decimal("1.5")
-        assert decimal_odds == 1.5
+        automator.page = mock_page
+        
+        assert automator.execute_betting_strategy(min_payout=50.0, max_payout=100.0) is False
+    
+    @pytest.mark.parametrize("odds,expected,tol", [
+        ("+150", 2.5, 0),
+        ("+100", 2.0, 0),
+        ("+200", 3.0, 0),
+        ("-150", 1.6667, 0.0001),
+        ("-200", 1.5, 0),
+        ("-250", 1.4, 0),
+        ("2.5", 2.5, 0),
+        ("1.5", 1.5, 0)
+    ])
+    def test_convert_odds_to_decimal(self, automator_prototype, odds, expected, tol):
+        """Test conversion of American and decimal odds to a decimal multiplier"""
+        decimal_odds = automator_prototype._convert_odds_to_decimal(odds)
+        assert decimal_odds == pytest.approx(expected, abs=tol or 1e-9)
+    
+    def test_convert_odds_to_decimal_is_memoized(self):
+        """Test that repeated odds strings are served from the conversion cache"""
+        FliffAutomator._convert_odds_to_decimal.cache_clear()
+        
+        assert FliffAutomator._convert_odds_to_decimal("+150") == 2.5
+        assert FliffAutomator._convert_odds_to_decimal("+150") == 2.5
+        
+        cache_info = FliffAutomator._convert_odds_to_decimal.cache_info()
+        assert (cache_info.hits, cache_info.misses) == (1, 1)
     
-    @patch('fliff_automator.sync_playwright')
-    def test_get_current_payout_success(self, mock_sync_playwright, mock_env_vars):
+    def test_get_current_payout_success(self, mock_playwright, mock_env_vars, automator):
         """Test successful current payout retrieval"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        mock_page = mock_playwright['page']
         
-        # Create automator and inject mock page
-        automator = FliffAutomator()
+        # Inject mock page
         automator.page = mock_page
         
         # Mock bet slip with payout
-        mock_bet_slip = Mock()
-        mock_bet_slip.text_content.return_value = "Potential payout: $25.50"
-        mock_page.wait_for_selector.return_value = mock_bet_slip
+        mock_page.locator.return_value = _FakeElement("Potential payout: $25.50")
 
-        payout = automator._get_current_payout()
+        payout = automator.get_current_payout()
         
         assert payout == pytest.approx(25.50, abs=0.01)
     
-    @patch('fliff_automator.sync_playwright')
-    def test_get_current_payout_no_payout(self, mock_sync_playwright, mock_env_vars):
+    def test_get_current_payout_no_payout(self, mock_playwright, mock_env_vars, automator):
         """Test current payout retrieval when no payout found"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
+        mock_page = mock_playwright['page']
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        # Create automator and inject mock page
-        automator = FliffAutomator()
+        # Inject mock page
         automator.page = mock_page
         
         # Mock bet slip without payout
-        mock_bet_slip = Mock()
-        mock_bet_slip.text_content.return_value = "No payout information"
-        mock_page.wait_for_selector.return_value = mock_bet_slip
+        mock_page.locator.return_value = _FakeElement("No payout information")
         
-        payout = automator._get_current_payout()
+        payout = automator.get_current_payout()
         
         assert payout == 0.0
     
-    @patch('fliff_automator.sync_playwright')
-    def test_take_bet_screenshot_success(self, mock_sync_playwright, mock_env_vars, tmp_path):
-        """Test successful bet screenshot"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
+    def test_payout_pattern_keeps_thousands_separators(self):
+        """Test that the precompiled payout pattern captures the full formatted amount"""
+        assert _PAYOUT_DEC_RE.search("Potential payout: $1,000.50").group() == "1,000.50"
+    
+    def test_loc_caches_locator(self, mock_env_vars, automator):
+        """Test that named locators are built once and reused"""
         mock_page = Mock()
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        # Mock bet slip
-        mock_bet_slip = Mock()
-        mock_bet_slip.screenshot.return_value = None
-        mock_page.wait_for_selector.return_value = mock_bet_slip
-        
-        automator = FliffAutomator()
         automator.page = mock_page
         
-        # Mock datetime to return predictable timestamp
-        with patch('fliff_automator.datetime') as mock_datetime:
-            mock_datetime.now.return_value.strftime.return_value = "20231201_120000"
-            
-            screenshot_path = automator.take_bet_screenshot()
-            
-            assert screenshot_path == "screenshots/bet_slip_20231201_120000.png"
-            mock_bet_slip.screenshot.assert_called_once_with(path=screenshot_path)
-    
-    @patch('fliff_automator.sync_playwright')
-    def test_take_bet_screenshot_failure(self, mock_sync_playwright, mock_env_vars):
-        """Test bet screenshot failure"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        # Mock bet slip with screenshot failure
-        mock_bet_slip = Mock()
-        mock_bet_slip.screenshot.side_effect = Exception("Screenshot failed")
-        mock_page.wait_for_selector.return_value = mock_bet_slip
+        first = automator._loc('bet_slip_container')
+        second = automator._loc('bet_slip_container')
         
-        automator = FliffAutomator()
-        screenshot_path = automator.take_bet_screenshot()
-        
-        assert screenshot_path == ""
+        assert first is second
+        mock_page.locator.assert_called_once_with(".mobile-ticket-container")
     
-    @patch('fliff_automator.sync_playwright')
-    def test_take_error_screenshot_success(self, mock_sync_playwright, mock_env_vars, tmp_path):
-        """Test successful error screenshot"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
+    @pytest.mark.parametrize("exc,expected", [
+        (None, b"jpeg data"),
+        (Exception("Screenshot failed"), b"")
+    ], ids=["success", "failure"])
+    def test_take_bet_screenshot_bytes(self, mock_env_vars, automator, exc, expected):
+        """Test that the bet slip is captured in memory as JPEG, or empty when capture fails"""
         mock_page = Mock()
+        mock_page.locator.return_value.screenshot.return_value = b"jpeg data"
+        mock_page.locator.return_value.screenshot.side_effect = exc
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        automator = FliffAutomator()
         automator.page = mock_page
         
-        # Mock datetime to return predictable timestamp
-        with patch('fliff_automator.datetime') as mock_datetime:
-            mock_datetime.now.return_value.strftime.return_value = "20231201_120000"
-            
-            screenshot_path = automator.take_error_screenshot()
-            
-            assert screenshot_path == "screenshots/error_20231201_120000.png"
-            mock_page.screenshot.assert_called_once_with(path=screenshot_path, full_page=True)
-    
-    @patch('fliff_automator.sync_playwright')
-    def test_take_error_screenshot_failure(self, mock_sync_playwright, mock_env_vars):
-        """Test error screenshot failure"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        assert automator.take_bet_screenshot_bytes() == expected
+        mock_page.locator.return_value.screenshot.assert_called_once_with(type='jpeg', quality=75)
+    
+    @pytest.mark.parametrize("exc,expected", [
+        (None, "screenshots/error_20231201_120000.jpg"),
+        (Exception("Screenshot failed"), "")
+    ], ids=["success", "failure"])
+    def test_take_error_screenshot(self, mock_playwright, mock_env_vars, automator, exc, expected):
+        """Test that the error screenshot path is returned, or empty when capture fails"""
+        mock_page = mock_playwright['page']
+        mock_page.screenshot.side_effect = exc
         
-        # Mock page with screenshot failure
-        mock_page.screenshot.side_effect = Exception("Screenshot failed")
+        automator.page = mock_page
         
-        automator = FliffAutomator()
-        screenshot_path = automator.take_error_screenshot()
+        assert automator.take_error_screenshot() == expected
         
-        assert screenshot_path == ""
+        mock_page.screenshot.assert_called_once_with(
+            path="screenshots/error_20231201_120000.jpg", full_page=True, type='jpeg', quality=70
+        )
     
-    @patch('fliff_automator.sync_playwright')
-    def test_close_success(self, mock_sync_playwright, mock_env_vars):
-        """Test successful cleanup"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-
-        automator = FliffAutomator()
+    @pytest.mark.parametrize("context_error", [None, Exception("Cleanup failed")], ids=["success", "with_error"])
+    def test_close(self, mock_playwright, mock_env_vars, automator, context_error):
+        """Test that cleanup releases every browser resource even if closing the context fails"""
+        mock_playwright_instance = mock_playwright['playwright']
+        mock_browser = mock_playwright['browser']
+        mock_context = mock_playwright['context']
+        mock_context.close.side_effect = context_error
+        
+        automator.playwright = mock_playwright_instance
         automator.browser = mock_browser
         automator.context = mock_context
+        # Should not raise exception
         automator.close()
-
+        
         # Verify cleanup sequence
-        mock_context.close.assert_called()
+        mock_context.close.assert_called_once()
         mock_browser.close.assert_called_once()
+        mock_playwright_instance.stop.assert_called_once()
+        assert automator.playwright is None
+        assert automator.browser is None
+        assert automator.context is None
     
-    @patch('fliff_automator.sync_playwright')
-    def test_close_with_error(self, mock_sync_playwright, mock_env_vars):
-        """Test cleanup with error"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-
-        # Mock cleanup failure
-        mock_context.close.side_effect = Exception("Cleanup failed")
-
-        automator = FliffAutomator()
-        automator.browser = mock_browser
-        automator.context = mock_context
-        # Should not raise exception
-        automator.close()
-
-        # Verify cleanup was attempted
-        mock_context.close.assert_called()
-        mock_browser.close.assert_called()
-    
-    @patch('fliff_automator.sync_playwright')
-    def test_retry_operation_success(self, mock_sync_playwright, mock_env_vars):
+    def test_retry_operation_success(self, mock_env_vars, automator):
         """Test retry operation with success on first attempt"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        automator = FliffAutomator()
-        
         # Mock successful operation
         def successful_operation():
             return "success"
@@ -556,22 +561,9 @@ class TestFliffAutomator:
         
         assert result == "success"
     
-    @patch('fliff_automator.sync_playwright')
-    def test_retry_operation_failure_then_success(self, mock_sync_playwright, mock_env_vars):
+    @patch('fliff_automator.time.sleep')
+    def test_retry_operation_failure_then_success(self, mock_sleep, mock_env_vars, automator):
         """Test retry operation with success after failure"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
-        
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
-        
-        automator = FliffAutomator()
-        
         # Mock operation that fails then succeeds
         call_count = 0
         
@@ -579,32 +571,46 @@ class TestFliffAutomator:
             nonlocal call_count
             call_count += 1
             if call_count == 1:
-                raise Exception("First attempt failed")
+                raise PlaywrightTimeoutError("First attempt failed")
             return "success"
         
         result = automator._retry_operation(sometimes_failing_operation, operation_name="test")
         
         assert result == "success"
+        mock_sleep.assert_called_once()
+        # Jittered backoff stays within [delay, 1.5 * delay] on the first retry
+        assert 1.0 <= mock_sleep.call_args[0][0] <= 1.5
     
-    @patch('fliff_automator.sync_playwright')
-    def test_retry_operation_max_retries_exceeded(self, mock_sync_playwright, mock_env_vars):
+    @patch('fliff_automator.time.sleep')
+    def test_retry_operation_max_retries_exceeded(self, mock_sleep, mock_env_vars, automator):
         """Test retry operation when max retries exceeded"""
-        # Mock Playwright components
-        mock_playwright_instance = Mock()
-        mock_browser = Mock()
-        mock_context = Mock()
-        mock_page = Mock()
+        # Mock always failing operation
+        def failing_operation():
+            raise PlaywrightTimeoutError("Operation failed")
         
-        mock_sync_playwright.return_value.start.return_value = mock_playwright_instance
-        mock_playwright_instance.chromium.launch.return_value = mock_browser
-        mock_browser.new_context.return_value = mock_context
-        mock_context.new_page.return_value = mock_page
+        with pytest.raises(PlaywrightTimeoutError, match="Operation failed"):
+            automator._retry_operation(failing_operation, operation_name="test")
         
-        automator = FliffAutomator()
+        assert mock_sleep.call_count == 2
+    
+    @patch('fliff_automator.time.sleep')
+    def test_retry_operation_retries_playwright_error(self, mock_sleep, mock_env_vars, automator):
+        """Test that generic Playwright errors such as network failures are retried"""
+        operation = Mock(side_effect=[PlaywrightError("net::ERR_CONNECTION_RESET"), "success"])
         
-        # Mock always failing operation
-        def failing_operation():
-            raise Exception("Operation failed")
+        result = automator._retry_operation(operation, operation_name="test")
+        
+        assert result == "success"
+        assert operation.call_count == 2
+        mock_sleep.assert_called_once()
+    
+    @patch('fliff_automator.time.sleep')
+    def test_retry_operation_non_retryable_error(self, mock_sleep, mock_env_vars, automator):
+        """Test that errors outside retry_on are re-raised without retrying"""
+        operation = Mock(side_effect=ValueError("Unrecoverable"))
+        
+        with pytest.raises(ValueError, match="Unrecoverable"):
+            automator._retry_operation(operation, operation_name="test")
         
-        with pytest.raises(Exception, match="Operation failed"):
-            automator._retry_operation(failing_operation, operation_name="test")
\ No newline at end of file
+        operation.assert_called_once()
+        mock_sleep.assert_not_called()
\ No newline at end of file
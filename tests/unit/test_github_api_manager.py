@@ -2,11 +2,15 @@
 Unit tests for GitHubAPIManager
 """
 import pytest
-import os
+import re
 import requests
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import Mock, patch
 from github_api_manager import GitHubAPIManager
 
+# Compiled once so pytest.raises does not recompile them on every run
+_MISSING_TOKEN_RE = re.compile("GITHUB_TOKEN environment variable is required")
+_MISSING_REPOSITORY_RE = re.compile("GITHUB_REPOSITORY environment variable is required")
+
 
 class TestGitHubAPIManager:
     """Test cases for GitHubAPIManager class"""
@@ -19,26 +23,38 @@ class TestGitHubAPIManager:
         assert manager.github_repository == 'test/test-repo'
         assert manager.workflow_filename == 'main.yml'
     
-    def test_init_missing_github_token(self):
+    def test_init_configures_session(self, github_manager):
+        """Test that the shared session carries auth headers and a retry policy"""
+        assert github_manager.session.headers['Authorization'] == 'token test_github_token'
+        assert github_manager.session.headers['Accept'] == 'application/vnd.github.v3+json'
+        
+        retry = github_manager.session.get_adapter('https://api.github.com').max_retries
+        assert retry.total == 3
+        assert 429 in retry.status_forcelist
+        assert 503 in retry.status_forcelist
+    
+    def test_init_missing_github_token(self, monkeypatch):
         """Test initialization failure when GITHUB_TOKEN is missing"""
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(ValueError, match="GITHUB_TOKEN environment variable is required"):
-                GitHubAPIManager()
+        monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+        
+        with pytest.raises(ValueError, match=_MISSING_TOKEN_RE):
+            GitHubAPIManager()
     
-    def test_init_missing_github_repository(self, mock_env_vars):
+    def test_init_missing_github_repository(self, monkeypatch):
         """Test initialization failure when GITHUB_REPOSITORY is missing"""
-        # Use fresh environment without GITHUB_REPOSITORY
-        with patch.dict('os.environ', {'GITHUB_TOKEN': 'test_token'}, clear=True):
-            with pytest.raises(ValueError, match="GITHUB_REPOSITORY environment variable is required"):
-                GitHubAPIManager()
+        monkeypatch.setenv('GITHUB_TOKEN', 'test_token')
+        monkeypatch.delenv('GITHUB_REPOSITORY', raising=False)
+        
+        with pytest.raises(ValueError, match=_MISSING_REPOSITORY_RE):
+            GitHubAPIManager()
     
-    @patch('github_api_manager.requests.get')
-    @patch('github_api_manager.requests.put')
-    def test_disable_workflow_success(self, mock_put, mock_get, mock_env_vars, sample_workflows_response):
+    @patch('github_api_manager.requests.Session.get')
+    @patch('github_api_manager.requests.Session.put')
+    def test_disable_workflow_success(self, mock_put, mock_get, github_manager, sample_workflow_response):
         """Test successful workflow disabling"""
         # Mock successful API responses
         mock_get_response = Mock()
-        mock_get_response.json.return_value = sample_workflows_response
+        mock_get_response.json.return_value = sample_workflow_response
         mock_get_response.raise_for_status.return_value = None
         mock_get.return_value = mock_get_response
         
@@ -46,136 +62,61 @@ class TestGitHubAPIManager:
         mock_put_response.raise_for_status.return_value = None
         mock_put.return_value = mock_put_response
         
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
+        result = github_manager.disable_workflow()
         
         assert result is True
         
         # Verify API calls were made correctly
         mock_get.assert_called_once_with(
-            "https://api.github.com/repos/test/test-repo/actions/workflows",
-            headers={
-                'Authorization': 'token test_github_token',
-                'Accept': 'application/vnd.github.v3+json'
-            }
+            "https://api.github.com/repos/test/test-repo/actions/workflows/main.yml"
         )
         
         mock_put.assert_called_once_with(
-            "https://api.github.com/repos/test/test-repo/actions/workflows/12345/disable",
-            headers={
-                'Authorization': 'token test_github_token',
-                'Accept': 'application/vnd.github.v3+json'
-            }
+            "https://api.github.com/repos/test/test-repo/actions/workflows/12345/disable"
         )
     
-    @patch('github_api_manager.requests.get')
-    def test_disable_workflow_no_workflows(self, mock_get, mock_env_vars):
-        """Test workflow disabling when no workflows are found"""
-        # Mock empty response
-        mock_get_response = Mock()
-        mock_get_response.json.return_value = {'workflows': []}
-        mock_get_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_get_response
-        
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
-        
-        assert result is False
-        mock_get.assert_called_once()
-    
-    @patch('github_api_manager.requests.get')
-    def test_disable_workflow_not_found(self, mock_get, mock_env_vars):
+    @patch('github_api_manager.requests.Session.put')
+    @patch('github_api_manager.requests.Session.get')
+    def test_disable_workflow_not_found(self, mock_get, mock_put, github_manager):
         """Test workflow disabling when target workflow is not found"""
-        # Mock response with different workflow
+        # Mock 404 for the workflow lookup
         mock_get_response = Mock()
-        mock_get_response.json.return_value = {
-            'workflows': [
-                {
-                    'id': 67890,
-                    'path': '.github/workflows/other.yml',
-                    'state': 'active'
-                }
-            ]
-        }
-        mock_get_response.raise_for_status.return_value = None
+        mock_get_response.status_code = 404
         mock_get.return_value = mock_get_response
         
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
+        result = github_manager.disable_workflow()
         
         assert result is False
         mock_get.assert_called_once()
+        mock_put.assert_not_called()
     
-    @patch('github_api_manager.requests.get')
-    def test_disable_workflow_get_request_fails(self, mock_get, mock_env_vars):
-        """Test workflow disabling when GET request fails"""
-        # Mock failed request
-        mock_get.side_effect = requests.exceptions.RequestException("Network error")
-        
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
-        
-        assert result is False
-    
-    @patch('github_api_manager.requests.get')
-    @patch('github_api_manager.requests.put')
-    def test_disable_workflow_put_request_fails(self, mock_put, mock_get, mock_env_vars, sample_workflows_response):
-        """Test workflow disabling when PUT request fails"""
-        # Mock successful GET but failed PUT
+    @pytest.mark.parametrize("get_error,status_error,put_error", [
+        pytest.param(requests.exceptions.RequestException("Network error"), None, None, id="get_fails"),
+        pytest.param(None, requests.exceptions.HTTPError("404 Not Found"), None, id="api_error"),
+        pytest.param(None, None, requests.exceptions.RequestException("Network error"), id="put_fails"),
+        pytest.param(None, None, Exception("Unexpected error"), id="unexpected_error"),
+    ])
+    @patch('github_api_manager.requests.Session.get')
+    @patch('github_api_manager.requests.Session.put')
+    def test_disable_workflow_failure_modes(self, mock_put, mock_get, get_error, status_error, put_error,
+                                            github_manager, sample_workflow_response):
+        """Test that a failure at any step of the lookup or disable call is reported as False"""
         mock_get_response = Mock()
-        mock_get_response.json.return_value = sample_workflows_response
-        mock_get_response.raise_for_status.return_value = None
+        mock_get_response.json.return_value = sample_workflow_response
+        mock_get_response.raise_for_status.side_effect = status_error
         mock_get.return_value = mock_get_response
+        mock_get.side_effect = get_error
+        mock_put.side_effect = put_error
         
-        mock_put.side_effect = requests.exceptions.RequestException("Network error")
-        
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
+        result = github_manager.disable_workflow()
         
         assert result is False
     
-    @patch('github_api_manager.requests.get')
-    def test_disable_workflow_api_error(self, mock_get, mock_env_vars):
-        """Test workflow disabling when API returns an error"""
-        # Mock API error response
-        mock_get_response = Mock()
-        mock_get_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
-        mock_get.return_value = mock_get_response
-        
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
-        
-        assert result is False
-    
-    @patch('github_api_manager.requests.get')
-    @patch('github_api_manager.requests.put')
-    def test_disable_workflow_unexpected_error(self, mock_put, mock_get, mock_env_vars, sample_workflows_response):
-        """Test workflow disabling when unexpected error occurs"""
-        # Mock successful GET but unexpected error during processing
-        mock_get_response = Mock()
-        mock_get_response.json.return_value = sample_workflows_response
-        mock_get_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_get_response
-        
-        # Simulate unexpected error
-        mock_put.side_effect = Exception("Unexpected error")
-        
-        manager = GitHubAPIManager()
-        result = manager.disable_workflow()
-        
-        assert result is False
-    
-    def test_workflow_filename_property(self, mock_env_vars):
-        """Test workflow_filename property"""
-        manager = GitHubAPIManager()
-        assert manager.workflow_filename == 'main.yml'
-    
-    def test_github_token_property(self, mock_env_vars):
-        """Test github_token property"""
-        manager = GitHubAPIManager()
-        assert manager.github_token == 'test_github_token'
-    
-    def test_github_repository_property(self, mock_env_vars):
-        """Test github_repository property"""
-        manager = GitHubAPIManager()
-        assert manager.github_repository == 'test/test-repo'
\ No newline at end of file
+    @pytest.mark.parametrize("attr,expected", [
+        ('workflow_filename', 'main.yml'),
+        ('github_token', 'test_github_token'),
+        ('github_repository', 'test/test-repo'),
+    ])
+    def test_properties(self, github_manager, attr, expected):
+        """Test the configuration exposed by the manager"""
+        assert getattr(github_manager, attr) == expected
\ No newline at end of file
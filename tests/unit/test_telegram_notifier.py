@@ -1,13 +1,59 @@
 """
 Unit tests for TelegramNotifier
 """
+import asyncio
 import pytest
-import os
+import re
+import threading
 from unittest.mock import Mock, patch, mock_open
-from datetime import datetime
 from telegram import Bot, InputFile
 from telegram.error import TelegramError
-from telegram_notifier import TelegramNotifier
+from telegram.request import HTTPXRequest
+from telegram_notifier import CONNECTION_POOL_SIZE, TelegramNotifier
+
+FAKE_PHOTO_PATH = "/fake/photo.jpg"
+
+# Compiled once so pytest.raises does not recompile them on every run
+_MISSING_BOT_TOKEN_RE = re.compile("TELEGRAM_BOT_TOKEN environment variable is required")
+_MISSING_CHAT_ID_RE = re.compile("TELEGRAM_CHAT_ID environment variable is required")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patch_bot():
+    """Patch Bot once for the module so no test builds a real Bot client"""
+    with patch('telegram_notifier.Bot') as bot_cls:
+        bot_cls.return_value = Mock(spec_set=Bot)
+        yield bot_cls
+
+@pytest.fixture(scope="module", autouse=True)
+def _patch_request():
+    """Patch the pooled HTTPXRequest once for the module so no test builds a real HTTP client"""
+    with patch('telegram_notifier.HTTPXRequest') as request_cls:
+        request_cls.return_value = Mock(spec=HTTPXRequest)
+        yield request_cls
+
+@pytest.fixture
+def mock_bot_class(_patch_bot):
+    """The module's patched Bot class with call history and side effects cleared"""
+    _patch_bot.reset_mock(side_effect=True)
+    return _patch_bot
+
+@pytest.fixture
+def mock_request_class(_patch_request):
+    """The module's patched HTTPXRequest class with call history and side effects cleared"""
+    _patch_request.reset_mock(side_effect=True)
+    return _patch_request
+
+def _assert_text_has(text, *needles):
+    """Assert that every needle appears in text, reporting all missing ones together"""
+    missing = [needle for needle in needles if needle not in text]
+    assert not missing, f"missing substrings: {missing}"
+
+@pytest.fixture
+def photo_file():
+    """Stand in for the screenshot file that send_photo reads from disk"""
+    with patch('telegram_notifier.open', mock_open(read_data=b'fake image data'), create=True) as mock_file:
+        yield mock_file
 
 
 class TestTelegramNotifier:
@@ -21,26 +67,39 @@ class TestTelegramNotifier:
         assert notifier.chat_id == 'test_chat_id'
         assert isinstance(notifier.bot, Bot)
     
-    def test_init_missing_bot_token(self):
+    def test_init_uses_pooled_request(self, mock_bot_class, mock_request_class, mock_env_vars):
+        """Test that the bot shares one pooled HTTP transport for the notifier's lifetime"""
+        notifier = TelegramNotifier()
+        
+        mock_request_class.assert_called_once_with(
+            connection_pool_size=CONNECTION_POOL_SIZE,
+            connect_timeout=5.0,
+            read_timeout=10.0,
+            write_timeout=20.0
+        )
+        assert notifier._request is mock_request_class.return_value
+        mock_bot_class.assert_called_once_with(token='test_telegram_token', request=notifier._request)
+    
+    def test_init_missing_bot_token(self, monkeypatch):
         """Test initialization failure when TELEGRAM_BOT_TOKEN is missing"""
-        with patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': '', 'TELEGRAM_CHAT_ID': 'test_chat_id'}, clear=False):
-            with pytest.raises(ValueError, match="TELEGRAM_BOT_TOKEN environment variable is required"):
-                TelegramNotifier()
+        monkeypatch.delenv('TELEGRAM_BOT_TOKEN', raising=False)
+        monkeypatch.setenv('TELEGRAM_CHAT_ID', 'test_chat_id')
+        
+        with pytest.raises(ValueError, match=_MISSING_BOT_TOKEN_RE):
+            TelegramNotifier()
     
-    def test_init_missing_chat_id(self, mock_env_vars):
+    def test_init_missing_chat_id(self, monkeypatch):
         """Test initialization failure when TELEGRAM_CHAT_ID is missing"""
-        with patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token', 'TELEGRAM_CHAT_ID': ''}, clear=False):
-            with pytest.raises(ValueError, match="TELEGRAM_CHAT_ID environment variable is required"):
-                TelegramNotifier()
+        monkeypatch.setenv('TELEGRAM_BOT_TOKEN', 'test_token')
+        monkeypatch.delenv('TELEGRAM_CHAT_ID', raising=False)
+        
+        with pytest.raises(ValueError, match=_MISSING_CHAT_ID_RE):
+            TelegramNotifier()
     
-    @patch('telegram_notifier.Bot')
-    def test_send_message_success(self, mock_bot_class, mock_env_vars):
+    def test_send_message_success(self, notifier):
         """Test successful message sending"""
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
         result = notifier.send_message("Test message", parse_mode='HTML')
         
         assert result is True
@@ -52,46 +111,85 @@ class TestTelegramNotifier:
             parse_mode='HTML'
         )
     
-    @patch('telegram_notifier.Bot')
-    def test_send_message_failure(self, mock_bot_class, mock_env_vars):
-        """Test message sending failure"""
-        # Mock bot instance with error
-        mock_bot = Mock()
-        mock_bot.send_message.side_effect = TelegramError("Failed to send message")
-        mock_bot_class.return_value = mock_bot
+    def test_send_message_awaits_coroutine(self, mock_bot_class, mock_env_vars):
+        """Test that async Bot API calls are driven to completion on the background loop"""
+        mock_bot = mock_bot_class.return_value
         
         notifier = TelegramNotifier()
-        result = notifier.send_message("Test message")
+        try:
+            result = notifier.send_message("Test message")
+        finally:
+            notifier.close()
         
-        assert result is False
+        assert result is True
+        mock_bot.send_message.assert_awaited_once_with(
+            chat_id='test_chat_id',
+            text='Test message',
+            parse_mode=None
+        )
     
-    @patch('telegram_notifier.Bot')
-    def test_send_message_unexpected_error(self, mock_bot_class, mock_env_vars):
-        """Test message sending with unexpected error"""
-        # Mock bot instance with unexpected error
-        mock_bot = Mock()
-        mock_bot.send_message.side_effect = Exception("Unexpected error")
-        mock_bot_class.return_value = mock_bot
+    @patch('telegram_notifier.SEND_TIMEOUT', 0.05)
+    def test_send_timeout_cancels_pending_call(self, mock_env_vars):
+        """Test that a send abandoned after SEND_TIMEOUT is cancelled rather than left to deliver late"""
+        cancelled = threading.Event()
+        
+        async def _hang(**kwargs):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
         
         notifier = TelegramNotifier()
+        notifier._send_message = _hang
+        try:
+            result = notifier.send_message("Test message")
+            
+            assert result is False
+            assert cancelled.wait(timeout=5)
+        finally:
+            notifier.close()
+    
+    def test_close_shuts_down_pooled_request(self, mock_request_class, mock_env_vars):
+        """Test that close releases the pooled HTTP client on the loop it was used from"""
+        notifier = TelegramNotifier()
+        notifier.send_message("Test message")
+        
+        notifier.close()
+        
+        mock_request_class.return_value.shutdown.assert_awaited_once_with()
+        assert notifier._loop is None
+    
+    def test_submit_runs_in_background(self, mock_bot_class, mock_env_vars):
+        """Test that submitted notifications run off the caller's thread and resolve to their result"""
+        mock_bot = mock_bot_class.return_value
+        
+        notifier = TelegramNotifier()
+        future = notifier.submit(notifier.send_status_update, "Test status message")
+        
+        assert future.result(timeout=5) is True
+        notifier.close()
+        mock_bot.send_message.assert_called_once()
+        assert notifier._executor is None
+    
+    @pytest.mark.parametrize("error", [
+        pytest.param(TelegramError("Failed to send message"), id="telegram_error"),
+        pytest.param(Exception("Unexpected error"), id="unexpected_error"),
+    ])
+    def test_send_message_failure(self, notifier, error):
+        """Test that Telegram and unexpected errors both make send_message report failure"""
+        mock_bot = notifier.bot
+        mock_bot.send_message.side_effect = error
+        
         result = notifier.send_message("Test message")
         
         assert result is False
     
-    @patch('telegram_notifier.Bot')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake image data')
-    def test_send_photo_success(self, mock_file, mock_bot_class, mock_env_vars, tmp_path):
+    def test_send_photo_success(self, notifier, photo_file):
         """Test successful photo sending"""
-        # Create a temporary file for testing
-        photo_path = tmp_path / "test_photo.jpg"
-        photo_path.write_text("fake photo content")
-        
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
-        result = notifier.send_photo(str(photo_path), "Test caption")
+        result = notifier.send_photo(FAKE_PHOTO_PATH, "Test caption")
         
         assert result is True
         
@@ -100,91 +198,87 @@ class TestTelegramNotifier:
         call_args = mock_bot.send_photo.call_args
         assert call_args[1]['chat_id'] == 'test_chat_id'
         assert call_args[1]['caption'] == "Test caption"
-        assert isinstance(call_args[1]['photo'], InputFile)
+        # The file is read and closed before the upload rather than left to the library
+        photo_file.assert_called_once_with(FAKE_PHOTO_PATH, 'rb')
+        photo_file.return_value.__exit__.assert_called_once()
+        assert call_args[1]['photo'].filename == "photo.jpg"
+        assert call_args[1]['photo'].input_file_content == b'fake image data'
     
-    @patch('telegram_notifier.Bot')
-    def test_send_photo_file_not_found(self, mock_bot_class, mock_env_vars):
+    def test_send_photo_file_not_found(self, notifier):
         """Test photo sending when file doesn't exist"""
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
         result = notifier.send_photo("nonexistent_photo.jpg", "Test caption")
         
         assert result is False
+        mock_bot.send_photo.assert_not_called()
     
-    @patch('telegram_notifier.Bot')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake image data')
-    def test_send_photo_failure(self, mock_file, mock_bot_class, mock_env_vars, tmp_path):
-        """Test photo sending failure"""
-        # Create a temporary file for testing
-        photo_path = tmp_path / "test_photo.jpg"
-        photo_path.write_text("fake photo content")
-        
-        # Mock bot instance with error
-        mock_bot = Mock()
-        mock_bot.send_photo.side_effect = TelegramError("Failed to send photo")
-        mock_bot_class.return_value = mock_bot
+    def test_send_photo_empty_file(self, notifier, photo_file):
+        """Test that a zero-byte screenshot is rejected without calling Telegram"""
+        photo_file.return_value.read.return_value = b''
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
-        result = notifier.send_photo(str(photo_path), "Test caption")
+        result = notifier.send_photo(FAKE_PHOTO_PATH, "Test caption")
         
         assert result is False
+        mock_bot.send_photo.assert_not_called()
     
-    @patch('telegram_notifier.Bot')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake image data')
-    def test_send_photo_unexpected_error(self, mock_file, mock_bot_class, mock_env_vars, tmp_path):
-        """Test photo sending with unexpected error"""
-        # Create a temporary file for testing
-        photo_path = tmp_path / "test_photo.jpg"
-        photo_path.write_text("fake photo content")
-        
-        # Mock bot instance with unexpected error
-        mock_bot = Mock()
-        mock_bot.send_photo.side_effect = Exception("Unexpected error")
-        mock_bot_class.return_value = mock_bot
+    @pytest.mark.parametrize("error", [
+        pytest.param(TelegramError("Failed to send photo"), id="telegram_error"),
+        pytest.param(Exception("Unexpected error"), id="unexpected_error"),
+    ])
+    def test_send_photo_failure(self, notifier, photo_file, error):
+        """Test that Telegram and unexpected errors both make send_photo report failure"""
+        mock_bot = notifier.bot
+        mock_bot.send_photo.side_effect = error
         
-        notifier = TelegramNotifier()
-        result = notifier.send_photo(str(photo_path), "Test caption")
+        result = notifier.send_photo(FAKE_PHOTO_PATH, "Test caption")
         
         assert result is False
     
-    @patch('telegram_notifier.Bot')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake image data')
-    def test_send_success_notification(self, mock_file, mock_bot_class, mock_env_vars, tmp_path):
-        """Test success notification with screenshot"""
-        # Create a temporary file for testing
-        screenshot_path = tmp_path / "success_screenshot.jpg"
-        screenshot_path.write_text("fake screenshot content")
+    def test_send_photo_bytes_success(self, notifier):
+        """Test sending in-memory photo data"""
+        mock_bot = notifier.bot
         
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        result = notifier.send_photo_bytes(b'fake image data', "Test caption", "bet_slip.jpg")
         
-        notifier = TelegramNotifier()
-        result = notifier.send_success_notification(10.50, str(screenshot_path))
+        assert result is True
+        call_args = mock_bot.send_photo.call_args
+        assert call_args[1]['chat_id'] == 'test_chat_id'
+        assert call_args[1]['caption'] == "Test caption"
+        assert isinstance(call_args[1]['photo'], InputFile)
+        assert call_args[1]['photo'].filename == "bet_slip.jpg"
+    
+    def test_send_photo_bytes_empty(self, notifier):
+        """Test that empty photo data is rejected without calling Telegram"""
+        mock_bot = notifier.bot
+        
+        result = notifier.send_photo_bytes(b'', "Test caption")
+        
+        assert result is False
+        mock_bot.send_photo.assert_not_called()
+    
+    def test_send_success_notification(self, notifier, photo_file):
+        """Test success notification with screenshot"""
+        mock_bot = notifier.bot
+        
+        result = notifier.send_success_notification(10.50, FAKE_PHOTO_PATH)
         
         assert result is True
         
-        # Verify both message and photo were sent
-        assert mock_bot.send_message.call_count == 1
-        assert mock_bot.send_photo.call_count == 1
+        # Verify the message was sent as the photo caption in a single call
+        mock_bot.send_message.assert_not_called()
+        mock_bot.send_photo.assert_called_once()
         
         # Check message content
-        message_call = mock_bot.send_message.call_args
-        assert "SUCCESS" in message_call[1]['text']
-        assert "$10.50" in message_call[1]['text']
-        assert "Goal: $10.00 ✓" in message_call[1]['text']
+        photo_call = mock_bot.send_photo.call_args
+        assert photo_call[1]['parse_mode'] == 'HTML'
+        _assert_text_has(photo_call[1]['caption'], "SUCCESS", "$10.50", "Goal: $10.00 ✓")
     
-    @patch('telegram_notifier.Bot')
-    def test_send_success_notification_no_screenshot(self, mock_bot_class, mock_env_vars):
+    def test_send_success_notification_no_screenshot(self, notifier):
         """Test success notification without screenshot"""
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
         result = notifier.send_success_notification(10.50)
         
         assert result is True
@@ -193,67 +287,64 @@ class TestTelegramNotifier:
         mock_bot.send_message.assert_called_once()
         mock_bot.send_photo.assert_not_called()
     
-    @patch('telegram_notifier.Bot')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake image data')
-    def test_send_bet_confirmation(self, mock_file, mock_bot_class, mock_env_vars, tmp_path):
-        """Test bet confirmation with screenshot"""
-        # Create a temporary file for testing
-        screenshot_path = tmp_path / "bet_screenshot.jpg"
-        screenshot_path.write_text("fake screenshot content")
-        
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+    def test_send_bet_confirmation(self, notifier):
+        """Test bet confirmation with in-memory screenshot"""
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
-        result = notifier.send_bet_confirmation(5.00, 25.50, str(screenshot_path))
+        result = notifier.send_bet_confirmation(5.00, 25.50, b'fake screenshot content')
         
         assert result is True
         
-        # Verify both message and photo were sent
-        assert mock_bot.send_message.call_count == 1
-        assert mock_bot.send_photo.call_count == 1
+        # Verify the message was sent as the photo caption in a single call
+        mock_bot.send_message.assert_not_called()
+        mock_bot.send_photo.assert_called_once()
         
         # Check message content
-        message_call = mock_bot.send_message.call_args
-        assert "BET PLACED SUCCESSFULLY" in message_call[1]['text']
-        assert "$5.00" in message_call[1]['text']
-        assert "$25.50" in message_call[1]['text']
+        photo_call = mock_bot.send_photo.call_args
+        assert photo_call[1]['photo'].filename == "bet_slip.jpg"
+        _assert_text_has(photo_call[1]['caption'], "BET PLACED SUCCESSFULLY", "$5.00", "$25.50")
     
-    @patch('telegram_notifier.Bot')
-    @patch('builtins.open', new_callable=mock_open, read_data=b'fake image data')
-    def test_send_error_notification(self, mock_file, mock_bot_class, mock_env_vars, tmp_path):
-        """Test error notification with screenshot"""
-        # Create a temporary file for testing
-        screenshot_path = tmp_path / "error_screenshot.jpg"
-        screenshot_path.write_text("fake screenshot content")
+    def test_send_bet_confirmation_upload_failure(self, notifier):
+        """Test that the confirmation falls back to text when the screenshot upload fails"""
+        mock_bot = notifier.bot
+        mock_bot.send_photo.side_effect = TelegramError("Failed to send photo")
         
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        result = notifier.send_bet_confirmation(5.00, 25.50, b'fake screenshot content')
         
-        notifier = TelegramNotifier()
-        result = notifier.send_error_notification("Test error message", str(screenshot_path))
+        assert result is True
+        mock_bot.send_message.assert_called_once()
+        assert "BET PLACED SUCCESSFULLY" in mock_bot.send_message.call_args[1]['text']
+    
+    def test_send_error_notification(self, notifier, photo_file):
+        """Test error notification with screenshot"""
+        mock_bot = notifier.bot
+        
+        result = notifier.send_error_notification("Test error message", FAKE_PHOTO_PATH)
         
         assert result is True
         
-        # Verify both message and photo were sent
-        assert mock_bot.send_message.call_count == 1
-        assert mock_bot.send_photo.call_count == 1
+        # Verify the message was sent as the photo caption in a single call
+        mock_bot.send_message.assert_not_called()
+        mock_bot.send_photo.assert_called_once()
         
         # Check message content
-        message_call = mock_bot.send_message.call_args
-        assert "ERROR" in message_call[1]['text']
-        assert "Test error message" in message_call[1]['text']
+        photo_call = mock_bot.send_photo.call_args
+        _assert_text_has(photo_call[1]['caption'], "ERROR", "Test error message")
     
-    @patch('telegram_notifier.Bot')
-    def test_send_error_notification_no_screenshot(self, mock_bot_class, mock_env_vars):
+    def test_send_error_notification_long_message(self, notifier, photo_file):
+        """Test that messages too long for a caption are sent before the screenshot"""
+        mock_bot = notifier.bot
+        
+        result = notifier.send_error_notification("x" * 1100, FAKE_PHOTO_PATH)
+        
+        assert result is True
+        mock_bot.send_message.assert_called_once()
+        assert mock_bot.send_photo.call_args[1]['caption'] == "Error screenshot"
+    
+    def test_send_error_notification_no_screenshot(self, notifier):
         """Test error notification without screenshot"""
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
         result = notifier.send_error_notification("Test error message")
         
         assert result is True
@@ -262,32 +353,22 @@ class TestTelegramNotifier:
         mock_bot.send_message.assert_called_once()
         mock_bot.send_photo.assert_not_called()
     
-    @patch('telegram_notifier.Bot')
-    def test_send_status_update(self, mock_bot_class, mock_env_vars):
+    def test_send_status_update(self, notifier):
         """Test status update"""
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
         
-        notifier = TelegramNotifier()
         result = notifier.send_status_update("Test status message")
         
         assert result is True
         
         # Verify message was sent with timestamp
         mock_bot.send_message.assert_called_once()
-        message_call = mock_bot.send_message.call_args
-        assert "STATUS UPDATE" in message_call[1]['text']
-        assert "Test status message" in message_call[1]['text']
+        _assert_text_has(mock_bot.send_message.call_args[1]['text'], "STATUS UPDATE", "Test status message")
     
-    @patch('telegram_notifier.Bot')
-    def test_send_message_without_parse_mode(self, mock_bot_class, mock_env_vars):
+    def test_send_message_without_parse_mode(self, notifier):
         """Test message sending without parse mode"""
-        # Mock bot instance
-        mock_bot = Mock()
-        mock_bot_class.return_value = mock_bot
+        mock_bot = notifier.bot
 
-        notifier = TelegramNotifier()
         result = notifier.send_message("Test message")
 
         assert result is True
@@ -299,17 +380,14 @@ class TestTelegramNotifier:
             parse_mode=None
         )
     
-    def test_bot_token_property(self, mock_env_vars):
-        """Test bot_token property"""
-        notifier = TelegramNotifier()
-        assert notifier.bot_token == 'test_telegram_token'
-    
-    def test_chat_id_property(self, mock_env_vars):
-        """Test chat_id property"""
-        notifier = TelegramNotifier()
-        assert notifier.chat_id == 'test_chat_id'
+    @pytest.mark.parametrize("attr,expected", [
+        ('bot_token', 'test_telegram_token'),
+        ('chat_id', 'test_chat_id'),
+    ])
+    def test_properties(self, notifier, attr, expected):
+        """Test the configuration exposed by the notifier"""
+        assert getattr(notifier, attr) == expected
     
-    def test_bot_property(self, mock_env_vars):
+    def test_bot_property(self, notifier):
         """Test bot property"""
-        notifier = TelegramNotifier()
         assert isinstance(notifier.bot, Bot)
\ No newline at end of file